@@ -1,5 +1,3 @@
-import os
-import sys
 from typing import List, Dict, Tuple, Optional
 
 import sphinx_rtd_theme  # pylint: disable=unused-import  # noqa:F401
@@ -10,14 +8,6 @@ import sphinx_rtd_theme  # pylint: disable=unused-import  # noqa:F401
 # list see the documentation:
 # https://www.sphinx-doc.org/en/master/usage/configuration.html
 
-# -- Path setup --------------------------------------------------------------
-
-# If extensions (or modules to document with autodoc) are in another directory,
-# add these directories to sys.path here. If the directory is relative to the
-# documentation root, use os.path.abspath to make it absolute, like shown here.
-#
-sys.path.insert(0, os.path.abspath('../../sandbox'))
-
 # -- Project information -----------------------------------------------------
 
 # the master toctree document
@@ -37,12 +27,14 @@ release = '1.5.2'
 # extensions coming with Sphinx (named 'sphinx.ext.*') or your custom
 # ones.
 extensions = [
+    # sphinx.ext.autodoc is still needed by autoapi's autodoc-style directives,
+    # but no code is imported because we only use the autoapi* directives.
     'sphinx.ext.autodoc',
+    'autoapi.extension',
     'sphinx.ext.napoleon',
     'sphinx.ext.viewcode',
     'sphinx.ext.intersphinx',
     'sphinx_rtd_theme',
-    "sphinxcontrib_django",
     "sphinxcontrib.openapi",
 ]
 
@@ -72,10 +64,22 @@ intersphinx_mapping: Dict[str, Tuple[str, Optional[str]]] = {
     'sphinx': ('https://www.sphinx-doc.org/en/master/', None),
 }
 
-# Configure the path to the Django settings module
-django_settings: str = "demo.settings"
-# Include the database table names of Django models
-django_show_db_tables: bool = True
+# sphinx-autoapi parses our source statically, so building the docs does not
+# need Django configured, a database, or any of our dependencies installed.
+autoapi_type: str = 'python'
+autoapi_dirs: List[str] = ['../../sphinx_hosting']
+autoapi_ignore: List[str] = ['*migrations*']
+# We write our own API pages with the autoapi* directives
+autoapi_generate_api_docs: bool = False
+autoapi_add_toctree_entry: bool = False
+autoapi_member_order: str = 'groupwise'
+# Keep the parsed output between builds
+autoapi_keep_files: bool = True
+
+# Don't let viewcode import our modules to follow imported names; importing
+# sphinx_hosting would pull in Django, which needs settings and a database.
+# autoapi supplies viewcode with the source locations it parsed instead.
+viewcode_import: bool = False
 
 
 # -- Options for HTML output -------------------------------------------------
@@ -90,6 +94,9 @@ html_theme: str = 'sphinx_rtd_theme'
 # so a file named "default.css" will overwrite the builtin "default.css".
 #html_static_path = ['_static']
 
+# Don't copy the .rst sources into the build output; we don't link to them
+# anyway, and skipping the copy speeds up the HTML build.
+html_copy_source = False
 html_show_sourcelink = False
 html_show_sphinx = False
 html_show_copyright = True
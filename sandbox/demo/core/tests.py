@@ -1,3 +1,40 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from sphinx_hosting.models import Project, Version
+
+
+class CachedCountLimitOffsetPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        project = Project.objects.create(title='Test Project', machine_name='test-project')
+        for i in range(3):
+            Version.objects.create(project=project, version=f'1.{i}.0')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_first_page(self):
+        response = self.client.get('/api/v1/versions/', {'limit': 2, 'offset': 0})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_later_page(self):
+        self.client.get('/api/v1/versions/', {'limit': 2, 'offset': 0})
+        response = self.client.get('/api/v1/versions/', {'limit': 2, 'offset': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_later_page_without_cached_count(self):
+        response = self.client.get('/api/v1/versions/', {'limit': 2, 'offset': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(len(response.data['results']), 1)
@@ -5,6 +5,8 @@ import structlog
 
 logger = structlog.get_logger('sphinx_hosting_demo')
 
+_stack_info_renderer = structlog.processors.StackInfoRenderer()
+
 
 def request_context_logging_processor(_, __, event_dict):
     """
@@ -43,3 +45,16 @@ def censor_password_processor(_, __, event_dict):
         if password_key_name in event_dict:
             event_dict[password_key_name] = '*CENSORED*'
     return event_dict
+
+
+def stack_and_exc_info_processor(logger, method_name, event_dict):
+    """
+    Renders ``stack_info`` and ``exc_info`` in one processor.  Most log calls
+    carry neither key, so check for them here instead of running
+    ``StackInfoRenderer`` and ``format_exc_info`` on every log record.
+    """
+    if 'stack_info' in event_dict:
+        event_dict = _stack_info_renderer(logger, method_name, event_dict)
+    if 'exc_info' in event_dict:
+        event_dict = structlog.processors.format_exc_info(logger, method_name, event_dict)
+    return event_dict
@@ -6,7 +6,11 @@ import environ
 import structlog
 
 from . import __version__
-from .logging import censor_password_processor, request_context_logging_processor
+from .logging import (
+    censor_password_processor,
+    request_context_logging_processor,
+    stack_and_exc_info_processor,
+)
 
 # The name of our project
 # ------------------------------------------------------------------------------
@@ -27,6 +31,10 @@ env = environ.Env()
 DEBUG = env.bool('DEBUG', default=False)
 DEVELOPMENT = env.bool('DEVELOPMENT', default=False)
 TESTING = env.bool('TESTING', default=False)
+# The development-only tools are never enabled unless DEVELOPMENT is True.
+# The "and" short-circuits, so their env vars are not even read otherwise.
+ENABLE_DEBUG_TOOLBAR = DEVELOPMENT and env.bool('ENABLE_DEBUG_TOOLBAR', default=False)
+ENABLE_QUERYINSPECT = DEVELOPMENT and env.bool('ENABLE_QUERYINSPECT', default=False)
 # Set BOOTSTRAP_ALWAYS_MIGRATE to True if you want to always run pending
 # migrations on container boot up
 BOOTSTRAP_ALWAYS_MIGRATE = env.bool('BOOTSTRAP_ALWAYS_MIGRATE', default=True)
@@ -69,6 +77,11 @@ else:
             'PASSWORD': env('DB_PASSWORD', default='password'),
             'HOST': env('DB_HOST', default='db'),
             'ATOMIC_REQUESTS': True,
+            # Keep database connections open between requests instead of
+            # reconnecting on every request, and check that a reused
+            # connection is still alive before using it.
+            'CONN_MAX_AGE': env.int('DB_CONN_MAX_AGE', default=60),
+            'CONN_HEALTH_CHECKS': True,
             # This is needed in case the database doesn't have the newer default
             # settings that enable "strict mode".
             'OPTIONS': {
@@ -87,12 +100,24 @@ if env.bool('DISABLE_CACHE', default=False):
             'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
         }
     }
-else:
+elif TESTING:
     CACHES = {
         'default': {
             'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         }
     }
+else:
+    # Use a shared cache so that all our gunicorn workers see the same cached
+    # data, instead of each worker having its own private LocMemCache.
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': env('REDIS_URL', default='redis://cache:6379/1'),
+            'OPTIONS': {
+                'max_connections': 50,
+            }
+        }
+    }
 
 # URLS
 # ------------------------------------------------------------------------------
@@ -187,10 +212,27 @@ STATICFILES_FINDERS = [
     'sass_processor.finders.CssFinder',
 ]
 
+# STORAGES
+# ------------------------------------------------------------------------------
+# https://docs.djangoproject.com/en/4.2/ref/settings/#storages
+STORAGES: Dict[str, Dict[str, Any]] = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        # Hash the names of our static files so that browsers can cache them
+        # forever.  This needs the manifest built by collectstatic, which we
+        # don't run for tests.
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage'
+            if TESTING else
+            'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'
+        ),
+    },
+}
+
 # MEDIA
 # ------------------------------------------------------------------------------
-# https://docs.djangoproject.com/en/3.2/ref/settings/#default-file-storage
-DEFAULT_FILE_STORAGE = 'django.core.files.storage.FileSystemStorage'
 # https://docs.djangoproject.com/en/3.2/ref/settings/#media-root
 # noinspection PyUnresolvedReferences
 MEDIA_ROOT = '/media'
@@ -264,6 +306,9 @@ X_FRAME_OPTIONS = 'DENY'
 # https://docs.djangoproject.com/en/3.2/ref/settings/#session-expire-at-browser-close
 # Don't use persistent sessions, since that could lead to a sensitive information leak.
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True
+# https://docs.djangoproject.com/en/3.2/ref/settings/#session-engine
+# Read sessions from the cache first, falling back to the database.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
 # https://docs.djangoproject.com/en/3.2/ref/settings/#session-cookie-age
 if not DEBUG:
     # Chrome and Firefox ignore SESSON_EXPIPE_AT_BROWSER_CLOSE
@@ -297,28 +342,32 @@ MANAGERS = ADMINS
 # ------------------------------------------------------------------------------
 # Use structlog to ease the difficulty of adding context to log messages
 # See https://structlog.readthedocs.io/en/stable/index.html
-structlog.configure(
-    processors=[
-        structlog.stdlib.filter_by_level,
-        structlog.stdlib.add_logger_name,
-        structlog.stdlib.add_log_level,
-        structlog.stdlib.PositionalArgumentsFormatter(),
-        structlog.processors.TimeStamper(fmt='iso'),
-        structlog.processors.StackInfoRenderer(),
-        structlog.processors.format_exc_info,
-        structlog.processors.UnicodeDecoder(),
-        request_context_logging_processor,
-        censor_password_processor,
-        structlog.stdlib.ProcessorFormatter.wrap_for_formatter
-    ],
-    context_class=dict,
-    logger_factory=structlog.stdlib.LoggerFactory(),
-    wrapper_class=structlog.stdlib.BoundLogger,
-    cache_logger_on_first_use=False,
-)
-
+#
+# Settings can be imported more than once in the same process (e.g. by some
+# management commands), so only build the processor chain the first time.
+if not structlog.is_configured():
+    structlog.configure(
+        processors=[
+            structlog.stdlib.filter_by_level,
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.PositionalArgumentsFormatter(),
+            structlog.processors.TimeStamper(fmt='iso'),
+            stack_and_exc_info_processor,
+            structlog.processors.UnicodeDecoder(),
+            request_context_logging_processor,
+            censor_password_processor,
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter
+        ],
+        context_class=dict,
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+        cache_logger_on_first_use=True,
+    )
+
+# Logs from other libraries (e.g. Django) almost never carry stack_info, so we
+# don't bother with StackInfoRenderer here.
 pre_chain = [
-    structlog.processors.StackInfoRenderer(),
     structlog.stdlib.add_logger_name,
     structlog.stdlib.add_log_level,
     structlog.processors.TimeStamper(fmt='iso'),
@@ -376,6 +425,25 @@ LOGGING = {
         },
     },
 }
+if TESTING:
+    # Tests only display WARNING logs and above, so skip the per-logger tree,
+    # but keep the structlog formatter so that structlog events still render
+    # as readable lines instead of raw event dicts.
+    LOGGING = {
+        'version': 1,
+        'disable_existing_loggers': False,
+        'root': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+        },
+        'handlers': {
+            'console': {
+                'class': 'logging.StreamHandler',
+                'formatter': 'structlog',
+            },
+        },
+        'formatters': LOGGING['formatters'],
+    }
 logging.config.dictConfig(LOGGING)
 
 # django-rest-framework
@@ -384,9 +452,9 @@ REST_FRAMEWORK = {
     # https://www.django-rest-framework.org/api-guide/authentication/#tokenauthentication
     'DEFAULT_AUTHENTICATION_CLASSES': ('rest_framework.authentication.TokenAuthentication',),
     # https://django-filter.readthedocs.io/en/master/guide/rest_framework.html
-    'DEFAULT_FILTER_BACKENDS': ('django_filters.rest_framework.DjangoFilterBackend',),
+    'DEFAULT_FILTER_BACKENDS': ('sphinx_hosting.api.filters.SkipEmptyFilterBackend',),
     # https://www.django-rest-framework.org/api-guide/pagination/#limitoffsetpagination
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
+    'DEFAULT_PAGINATION_CLASS': 'sphinx_hosting.api.pagination.CachedCountLimitOffsetPagination',
     'PAGE_SIZE': 100,
 }
 
@@ -407,6 +475,8 @@ HAYSTACK_CONNECTIONS = {
 # ------------------------------------------------------------------------------
 CRISPY_ALLOWED_TEMPLATE_PACKS = 'bootstrap5'
 CRISPY_TEMPLATE_PACK = 'bootstrap5'
+# Raise errors from rendering bad layouts in dev, but not in prod
+CRISPY_FAIL_SILENTLY = not DEBUG
 
 
 # django-theme-academy
@@ -441,15 +511,21 @@ XFF_HEADER_REQUIRED = env.bool('XFF_HEADER_REQUIRED', default=False)
 # REST Framework
 REST_FRAMEWORK = {
     # https://www.django-rest-framework.org/api-guide/parsers/#setting-the-parsers
+    # https://github.com/brianjbuck/drf_orjson_renderer
     'DEFAULT_PARSER_CLASSES': (
-        'rest_framework.parsers.JSONParser',
+        'drf_orjson_renderer.parsers.ORJSONParser',
+    ),
+    # https://www.django-rest-framework.org/api-guide/renderers/#setting-the-renderers
+    'DEFAULT_RENDERER_CLASSES': (
+        'drf_orjson_renderer.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ),
     # https://www.django-rest-framework.org/api-guide/authentication/#tokenauthentication
     'DEFAULT_AUTHENTICATION_CLASSES': ('rest_framework.authentication.TokenAuthentication',),
     # https://django-filter.readthedocs.io/en/master/guide/rest_framework.html
-    'DEFAULT_FILTER_BACKENDS': ('django_filters.rest_framework.DjangoFilterBackend',),
+    'DEFAULT_FILTER_BACKENDS': ('sphinx_hosting.api.filters.SkipEmptyFilterBackend',),
     # https://www.django-rest-framework.org/api-guide/pagination/#limitoffsetpagination
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
+    'DEFAULT_PAGINATION_CLASS': 'sphinx_hosting.api.pagination.CachedCountLimitOffsetPagination',
     # https://github.com/tfranzel/drf-spectacular
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'PAGE_SIZE': 100,
@@ -531,6 +607,25 @@ GET /api/v1/projects/?limit=50
 ```
 
 will retrieve 50 projects instead of 100.
+
+### Pages and images
+
+`/api/v1/pages/` and `/api/v1/images/` can have very many rows, so they use cursor pagination instead:
+
+```json
+{
+    "next": "https://localhost/api/v1/pages/?cursor=cD0xMjM%3D",
+    "previous": null,
+    "results": [
+        [ ... ]
+    ]
+}
+```
+
+* There is no `count` key in these results.
+* The `offset` param is ignored.  To page through the results, `GET` the URLs from the `next` and `previous` keys, which
+  carry a `cursor` param; don't build cursors yourself.
+* `limit` still sets the number of results per page.
 """
 
 
@@ -540,7 +635,6 @@ will retrieve 50 projects instead of 100.
 # django-debug-toolbar
 # ------------------------------------------------------------------------------
 # We don't enable the debug toolbar unless DEVELOPMENT is also True.
-ENABLE_DEBUG_TOOLBAR = DEVELOPMENT and env.bool('ENABLE_DEBUG_TOOLBAR', default=False)
 if ENABLE_DEBUG_TOOLBAR:
     # https://django-debug-toolbar.readthedocs.io/en/latest/installation.html#prerequisites
     INSTALLED_APPS += ['debug_toolbar']  # noqa F405
@@ -570,7 +664,7 @@ if ENABLE_DEBUG_TOOLBAR:
 
 # django-queryinspect
 # ------------------------------------------------------------------------------
-if DEVELOPMENT and env.bool('ENABLE_QUERYINSPECT', default=False):
+if ENABLE_QUERYINSPECT:
     # Configure django-queryinspect
     MIDDLEWARE += ['qinspect.middleware.QueryInspectMiddleware']
     # Whether the Query Inspector should do anything (default: False)
@@ -596,5 +690,3 @@ if DEVELOPMENT and env.bool('ENABLE_QUERYINSPECT', default=False):
 # https://docs.djangoproject.com/en/3.0/ref/settings/#std:setting-TEST_RUNNER
 if TESTING:
     DEBUG = False
-    # Set the root logger to only display WARNING logs and above during tests.
-    logging.getLogger('').setLevel(logging.WARNING)
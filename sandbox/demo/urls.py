@@ -7,15 +7,19 @@ from sphinx_hosting import urls as sphinx_hosting_urls
 from sphinx_hosting.api import urls as sphinx_hosting_api_urls
 
 
+# The includes with a distinct prefix come first so the resolver can reject
+# them with a single prefix check; the catch-all sphinx_hosting include with
+# the empty prefix goes last.
 urlpatterns = [
-    path('', include(sphinx_hosting_urls, namespace='sphinx_hosting')),
     path('api/v1/', include(sphinx_hosting_api_urls, namespace='sphinx_hosting_api')),
     path('accounts/', include('django.contrib.auth.urls')),
-    path('admin/', include(admin.site.urls[:2], namespace=admin.site.name)),
+    path('admin/', admin.site.urls),
     path('wildewidgets_json', WildewidgetDispatch.as_view(), name='wildewidgets_json'),
+    path('', include(sphinx_hosting_urls, namespace='sphinx_hosting')),
 ]
 
 
 if settings.ENABLE_DEBUG_TOOLBAR:
     import debug_toolbar
-    urlpatterns.append(path('__debug__/', include(debug_toolbar.urls)))
+    # Put this ahead of the catch-all sphinx_hosting include
+    urlpatterns.insert(0, path('__debug__/', include(debug_toolbar.urls)))
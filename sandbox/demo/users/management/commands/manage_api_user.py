@@ -3,6 +3,9 @@ from django.core.management.base import BaseCommand
 
 from demo.users.models import APIUser
 
+#: API usernames always start with this
+API_USERNAME_PREFIX = 'api-'
+
 
 class Command(BaseCommand):
     help = 'Create or update an API-Only user'
@@ -55,32 +58,30 @@ class Command(BaseCommand):
                 print("Aborting.")
             else:
                 username = options['username']
-                if not username.startswith('api-'):
-                    print('Prefixing the username with "api-" ...')
-                    username = f'api-{username}'
+                if not username.startswith(API_USERNAME_PREFIX):
+                    print(f'Prefixing the username with "{API_USERNAME_PREFIX}" ...')
+                    username = API_USERNAME_PREFIX + username
                 user = APIUser(
                     username=username,
                     first_name=options['first_name'],
                     last_name=options['last_name'],
                     email=options['email']
                 )
+                # finalize_api_user creates the token with Token(user=user), which
+                # also caches it on user.auth_token, so no refetch is needed
                 user.save()
-                user.refresh_from_db()
                 print(f'Created APIUser object for {user.first_name} {user.last_name} ({user.username}): ID={user.id}')
                 print(f'Token for {user.username}: {user.auth_token.key}')
         else:
             if options['show_token']:
                 print(f'Token for {user.username}: {user.auth_token.key}')
             else:
-                updates = {
-                    key: value
-                    for key, value in options.items()
-                    if value is not None and key in [
-                        'first_name',
-                        'last_name',
-                        'email',
-                    ]
-                }
-                if updates:
-                    APIUser.objects.filter(pk=user.id).update(**updates)
+                changed = [
+                    key for key in ('first_name', 'last_name', 'email')
+                    if options[key] is not None
+                ]
+                for key in changed:
+                    setattr(user, key, options[key])
+                if changed:
+                    user.save(update_fields=changed)
                 print(f'Updated APIUser object for {user.first_name} {user.last_name} ({user.username}): ID={user.id}')
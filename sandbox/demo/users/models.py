@@ -18,7 +18,11 @@ class User(AbstractUser):
 class APIUserManager(UserManager):
 
     def get_queryset(self):
-        return User.objects.filter(groups__name='API Users')
+        # Filter on a subquery for the group id instead of joining
+        # auth_group by name.  Don't cache the id: the group can be deleted
+        # and recreated, or the database flushed, under a running process.
+        api_group = Group.objects.filter(name='API Users').values('id')
+        return User.objects.filter(groups__in=api_group)
 
 
 class APIUser(User):
@@ -41,6 +45,12 @@ class APIUser(User):
 @receiver(post_save, sender=APIUser)
 def finalize_api_user(sender, instance, created, **kwargs):
     if created:
-        g = Group.objects.get(name='API Users')
-        g.user_set.add(instance)
+        # Insert the group membership row directly rather than going through
+        # Group.user_set.add(), which has to fetch the group first
+        through = User.groups.through
+        group_id = Group.objects.values_list('id', flat=True).get(name='API Users')
+        through.objects.bulk_create(
+            [through(user_id=instance.id, group_id=group_id)],
+            ignore_conflicts=True
+        )
         Token.objects.get_or_create(user=instance)
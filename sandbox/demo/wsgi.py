@@ -18,6 +18,11 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'demo.settings')
 # This application object is used by any WSGI server configured to use this file.
 application = get_wsgi_application()
 
+# Import the URLconf and build the resolver's reverse/namespace caches now, in
+# each worker at startup, instead of on the first request that worker serves.
+from django.urls import get_resolver  # noqa: E402
+get_resolver().reverse_dict  # pylint: disable=expression-not-assigned
+
 # Apply WSGI middleware here.
 # from helloworld.wsgi import HelloWorldApplication
 # application = HelloWorldApplication(application)
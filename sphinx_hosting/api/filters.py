@@ -0,0 +1,30 @@
+from django.db.models import QuerySet
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.request import Request
+from rest_framework.views import APIView
+
+
+class SkipEmptyFilterBackend(DjangoFilterBackend):
+    """
+    A :py:class:`django_filters.rest_framework.DjangoFilterBackend` that
+    doesn't bother building and running the view's filterset when the request
+    has none of the filterset's query parameters, which is the case for most
+    list calls.
+
+    Use this in place of ``DjangoFilterBackend`` in
+    ``REST_FRAMEWORK['DEFAULT_FILTER_BACKENDS']``.  Filtered requests behave
+    exactly as they do with ``DjangoFilterBackend``.
+    """
+
+    def filter_queryset(
+        self,
+        request: Request,
+        queryset: QuerySet,
+        view: APIView
+    ) -> QuerySet:
+        filterset_class = self.get_filterset_class(view, queryset)
+        if filterset_class is None:
+            return queryset
+        if not any(name in request.query_params for name in filterset_class.base_filters):
+            return queryset
+        return super().filter_queryset(request, queryset, view)
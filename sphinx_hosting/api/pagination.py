@@ -0,0 +1,87 @@
+import hashlib
+from typing import Any, List, Optional
+
+from django.core.cache import cache
+from django.db.models import QuerySet
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+from rest_framework.request import Request
+from rest_framework.views import APIView
+
+
+class CachedCountLimitOffsetPagination(LimitOffsetPagination):
+    """
+    A :py:class:`rest_framework.pagination.LimitOffsetPagination` that caches
+    the ``COUNT(*)`` it does for the ``count`` in each response, so that
+    paging through a large list (pages and images, especially) doesn't count
+    the whole table again for every page.
+
+    The count is always recomputed for the first page (``offset=0``), so
+    totals are never more than :py:attr:`count_cache_timeout` seconds stale
+    for a client walking the list from the beginning.
+
+    Use this in place of ``LimitOffsetPagination`` in
+    ``REST_FRAMEWORK['DEFAULT_PAGINATION_CLASS']``.
+
+    .. warning::
+
+        The cache key is built from the request path and query parameters
+        only, not from the user or the queryset.  This is only safe while our
+        list querysets are the same for every user; if a viewset starts
+        filtering its list by user, it must not use this paginator.
+    """
+
+    #: How long to keep counts in the cache, in seconds
+    count_cache_timeout: int = 300
+
+    def get_count_cache_key(self) -> str:
+        """
+        Return the cache key for the count for the current request.  Requests
+        that differ only in their ``limit`` and ``offset`` share a key.
+
+        Returns:
+            The cache key.
+        """
+        params = sorted(
+            (key, value)
+            for key, value in self.request.query_params.lists()
+            if key not in (self.limit_query_param, self.offset_query_param)
+        )
+        digest = hashlib.md5(f'{self.request.path}?{params}'.encode('utf-8')).hexdigest()
+        return f'sphinx_hosting.api.count.{digest}'
+
+    def paginate_queryset(
+        self,
+        queryset: QuerySet,
+        request: Request,
+        view: Optional[APIView] = None
+    ) -> Optional[List[Any]]:
+        # Older versions of DRF (3.14 and before) call get_count() before
+        # they set self.request, and get_count() needs it
+        self.request = request
+        return super().paginate_queryset(queryset, request, view=view)
+
+    def get_count(self, queryset: QuerySet) -> int:
+        key = self.get_count_cache_key()
+        if self.get_offset(self.request) != 0:
+            count = cache.get(key)
+            if count is not None:
+                return count
+        count = super().get_count(queryset)
+        cache.set(key, count, self.count_cache_timeout)
+        return count
+
+
+class IDCursorPagination(CursorPagination):
+    """
+    A :py:class:`rest_framework.pagination.CursorPagination` over primary
+    keys, for our big tables (pages and images).  Each page is fetched with
+    ``WHERE id > <cursor> ORDER BY id LIMIT <n>``, so fetching the last page
+    of a large list costs the same as fetching the first, unlike with
+    ``OFFSET``.
+
+    The page size comes from ``REST_FRAMEWORK['PAGE_SIZE']``, and clients may
+    choose their own with the ``limit`` query parameter.
+    """
+
+    ordering: str = 'id'
+    page_size_query_param: str = 'limit'
@@ -1,4 +1,26 @@
 from rest_framework import permissions
+from rest_framework.request import Request
+
+
+def has_perm_cached(request: Request, perm: str) -> bool:
+    """
+    Return ``request.user.has_perm(perm)``, remembering the answer on
+    ``request`` so that permission classes that check the same permission on
+    the same request only go through the auth backends once.
+
+    Args:
+        request: the current request
+        perm: the permission to check, e.g. ``sphinxhostingcore.change_project``
+
+    Returns:
+        ``True`` if the user has the permission, ``False`` otherwise.
+    """
+    cache = getattr(request, '_sphinx_hosting_perm_cache', None)
+    if cache is None:
+        cache = request._sphinx_hosting_perm_cache = {}
+    if perm not in cache:
+        cache[perm] = request.user.has_perm(perm)
+    return cache[perm]
 
 
 class ChangeProjectPermission(permissions.BasePermission):
@@ -14,7 +36,7 @@ class ChangeProjectPermission(permissions.BasePermission):
     def has_permission(self, request, view):
         if request.method in permissions.SAFE_METHODS:
             return True
-        if request.user.has_perm('sphinxhostingcore.change_project'):
+        if has_perm_cached(request, 'sphinxhostingcore.change_project'):
             return True
         return False
 
@@ -31,6 +53,6 @@ class AddVersionPermission(permissions.BasePermission):
     def has_permission(self, request, view):
         if request.method in permissions.SAFE_METHODS:
             return True
-        if request.user.has_perm('sphinxhostingcore.add_version'):
+        if has_perm_cached(request, 'sphinxhostingcore.add_version'):
             return True
         return False
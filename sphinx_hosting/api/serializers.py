@@ -1,8 +1,10 @@
-from typing import Type, Tuple, Dict, Any
+from typing import Type, Tuple, Dict, Any, Optional
 
 from django.db.models import Model
+from django.urls import get_script_prefix, reverse
 from rest_framework import serializers
 from rest_framework.relations import RelatedField
+from rest_framework.request import Request
 
 from sphinx_hosting.models import (
     Classifier,
@@ -14,7 +16,94 @@ from sphinx_hosting.models import (
 )
 
 
+class FastHyperlinkedRelatedField(serializers.HyperlinkedRelatedField):
+    """
+    A :py:class:`rest_framework.serializers.HyperlinkedRelatedField` that
+    reverses its ``view_name`` only once per process, and afterwards builds
+    object URLs by substituting the pk into the cached path.
+
+    ``reverse()`` plus ``request.build_absolute_uri()`` per related object is
+    most of the cost of rendering our list endpoints, since each object has
+    several hyperlinked relations.
+
+    We fall back to the stock behavior whenever we can't do the substitution
+    safely: for lookups other than ``pk``, for format suffixes, and for
+    requests with a per-request urlconf.
+    """
+
+    #: The placeholder we reverse with, and then replace with the real pk
+    PK_PLACEHOLDER: str = '__pk__'
+
+    #: ``(view_name, script_prefix)`` -> URL path containing :py:attr:`PK_PLACEHOLDER`
+    _templates: Dict[Tuple[str, str], str] = {}
+
+    def get_url(
+        self,
+        obj: Model,
+        view_name: str,
+        request: Optional[Request],
+        format: Optional[str]  # pylint: disable=redefined-builtin
+    ) -> Optional[str]:
+        if (
+            self.lookup_field != 'pk' or
+            format or
+            getattr(request, 'urlconf', None) is not None
+        ):
+            return super().get_url(obj, view_name, request, format)
+        if obj.pk is None:
+            # Unsaved objects don't have URLs
+            return None
+        key = (view_name, get_script_prefix())
+        template = self._templates.get(key)
+        if template is None:
+            template = reverse(
+                view_name,
+                kwargs={self.lookup_url_kwarg: self.PK_PLACEHOLDER}
+            )
+            self._templates[key] = template
+        url = template.replace(self.PK_PLACEHOLDER, str(obj.pk))
+        if request is None:
+            return url
+        # Cache the scheme and host on the request; they don't change within it
+        prefix = getattr(request, '_sphinx_hosting_url_prefix', None)
+        if prefix is None:
+            prefix = request.build_absolute_uri('/')[:-1]
+            request._sphinx_hosting_url_prefix = prefix
+        return prefix + url
+
+
 class ClassifierSerializer(serializers.HyperlinkedModelSerializer):
+    """
+    Classifiers are a small, slowly changing set, but they're rendered once
+    per project in project listings.  We memoize their representations,
+    keyed by everything the representation depends on -- the classifier's
+    pk and name, and the scheme, host and script prefix used to build its
+    URL -- so a renamed classifier simply gets a new cache entry.
+    """
+
+    #: The maximum number of representations to keep in :py:attr:`_representations`
+    MAX_CACHED: int = 1024
+
+    _representations: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+
+    def to_representation(self, instance: Classifier) -> Dict[str, Any]:
+        request = self.context.get('request')
+        if request is None:
+            return super().to_representation(instance)
+        key = (
+            instance.pk,
+            instance.name,
+            request.build_absolute_uri('/'),
+            get_script_prefix(),
+        )
+        data = self._representations.get(key)
+        if data is None:
+            data = super().to_representation(instance)
+            if len(self._representations) >= self.MAX_CACHED:
+                self._representations.clear()
+            self._representations[key] = data
+        # Hand out a copy so callers can't modify our cached version
+        return dict(data)
 
     class Meta:
         model: Type[Model] = Classifier
@@ -30,18 +119,18 @@ class ClassifierSerializer(serializers.HyperlinkedModelSerializer):
 
 class ProjectSerializer(serializers.HyperlinkedModelSerializer):
 
-    versions: RelatedField = serializers.HyperlinkedRelatedField(
+    versions: RelatedField = FastHyperlinkedRelatedField(
         many=True,
         read_only=True,
         view_name='sphinx_hosting_api:version-detail'
     )
-    latest_version: RelatedField = serializers.HyperlinkedRelatedField(
+    latest_version: RelatedField = FastHyperlinkedRelatedField(
         many=False,
         read_only=True,
         view_name='sphinx_hosting_api:version-detail'
     )
     classifiers: serializers.Serializer = ClassifierSerializer(many=True)
-    related_links: RelatedField = serializers.HyperlinkedRelatedField(
+    related_links: RelatedField = FastHyperlinkedRelatedField(
         many=True,
         read_only=True,
         view_name='sphinx_hosting_api:projectrelatedlink-detail'
@@ -66,9 +155,28 @@ class ProjectSerializer(serializers.HyperlinkedModelSerializer):
         }
 
 
+class ProjectListSerializer(ProjectSerializer):
+    """
+    The serializer for listing projects.  It omits the ``versions`` and
+    ``related_links`` lists, which grow with the project; get those from the
+    project detail endpoint.
+    """
+
+    class Meta(ProjectSerializer.Meta):
+        fields: Tuple[str, ...] = (
+            'url',
+            'id',
+            'title',
+            'machine_name',
+            'description',
+            'classifiers',
+            'latest_version',
+        )
+
+
 class ProjectRelatedLinkSerializer(serializers.HyperlinkedModelSerializer):
 
-    project: RelatedField = serializers.HyperlinkedRelatedField(
+    project: RelatedField = FastHyperlinkedRelatedField(
         queryset=Project.objects.all(),
         view_name='sphinx_hosting_api:project-detail'
     )
@@ -89,20 +197,20 @@ class ProjectRelatedLinkSerializer(serializers.HyperlinkedModelSerializer):
 
 class VersionSerializer(serializers.HyperlinkedModelSerializer):
 
-    project: RelatedField = serializers.HyperlinkedRelatedField(
+    project: RelatedField = FastHyperlinkedRelatedField(
         read_only=True,
         view_name='sphinx_hosting_api:project-detail'
     )
-    head: RelatedField = serializers.HyperlinkedRelatedField(
+    head: RelatedField = FastHyperlinkedRelatedField(
         read_only=True,
         view_name='sphinx_hosting_api:sphinxpage-detail'
     )
-    pages: RelatedField = serializers.HyperlinkedRelatedField(
+    pages: RelatedField = FastHyperlinkedRelatedField(
         many=True,
         read_only=True,
         view_name='sphinx_hosting_api:sphinxpage-detail'
     )
-    images: RelatedField = serializers.HyperlinkedRelatedField(
+    images: RelatedField = FastHyperlinkedRelatedField(
         many=True,
         read_only=True,
         view_name='sphinx_hosting_api:sphinximage-detail'
@@ -126,6 +234,25 @@ class VersionSerializer(serializers.HyperlinkedModelSerializer):
         }
 
 
+class VersionListSerializer(VersionSerializer):
+    """
+    The serializer for listing versions.  It omits the ``pages`` and
+    ``images`` lists, which can run to hundreds of entries per version; get
+    those from the version detail endpoint.
+    """
+
+    class Meta(VersionSerializer.Meta):
+        fields: Tuple[str, ...] = (
+            'url',
+            'id',
+            'project',
+            'version',
+            'sphinx_version',
+            'archived',
+            'head',
+        )
+
+
 class VersionUploadSerializer(serializers.Serializer):
     """
     The actual work of importing the file is done in
@@ -148,20 +275,20 @@ class VersionUploadSerializer(serializers.Serializer):
 
 class SphinxPageSerializer(serializers.HyperlinkedModelSerializer):
 
-    version: RelatedField = serializers.HyperlinkedRelatedField(
+    version: RelatedField = FastHyperlinkedRelatedField(
         read_only=True,
         view_name='sphinx_hosting_api:version-detail'
     )
-    parent: RelatedField = serializers.HyperlinkedRelatedField(   # type: ignore
+    parent: RelatedField = FastHyperlinkedRelatedField(   # type: ignore
         read_only=True,
         view_name='sphinx_hosting_api:sphinxpage-detail'
     )
-    previous_page: RelatedField = serializers.HyperlinkedRelatedField(
+    previous_page: RelatedField = FastHyperlinkedRelatedField(
         many=True,
         read_only=True,
         view_name='sphinx_hosting_api:sphinxpage-detail'
     )
-    next_page: RelatedField = serializers.HyperlinkedRelatedField(
+    next_page: RelatedField = FastHyperlinkedRelatedField(
         read_only=True,
         view_name='sphinx_hosting_api:sphinxpage-detail'
     )
@@ -190,9 +317,28 @@ class SphinxPageSerializer(serializers.HyperlinkedModelSerializer):
         }
 
 
+class SphinxPageListSerializer(SphinxPageSerializer):
+    """
+    The serializer for listing pages.  It omits the page content and HTML
+    columns, which are large; get those from the page detail endpoint.
+    """
+
+    class Meta(SphinxPageSerializer.Meta):
+        fields: Tuple[str, ...] = (
+            'url',
+            'id',
+            'version',
+            'title',
+            'relative_path',
+            'searchable',
+            'parent',
+            'next_page',
+            'previous_page',
+        )
+
+
 class SphinxImageSerializer(serializers.HyperlinkedModelSerializer):
-    version: RelatedField = serializers.HyperlinkedRelatedField(
-        many=True,
+    version: RelatedField = FastHyperlinkedRelatedField(
         read_only=True,
         view_name='sphinx_hosting_api:version-detail'
     )
@@ -204,6 +350,7 @@ class SphinxImageSerializer(serializers.HyperlinkedModelSerializer):
             'id',
             'version',
             'orig_path',
+            'size',
         )
         extra_kwargs = {
             'url': {'view_name': 'sphinx_hosting_api:sphinximage-detail'},
@@ -3,13 +3,13 @@ from typing import List, Union
 from django.urls import include, path, URLPattern, URLResolver
 
 from drf_spectacular.views import (
-    SpectacularAPIView,
     SpectacularRedocView,
     SpectacularSwaggerView
 )
 from rest_framework import routers
 
 from .views import (
+    CachedSpectacularAPIView,
     ClassifierViewSet,
     ProjectViewSet,
     ProjectRelatedLinkViewSet,
@@ -33,7 +33,7 @@ router.register(r'related-links', ProjectRelatedLinkViewSet)
 urlpatterns: List[Union[URLPattern, URLResolver]] = [
     path('', include(router.urls)),
     path('version/import/', VersionUploadView.as_view(), name='version-import'),
-    path('schema/', SpectacularAPIView.as_view(), name='schema'),
+    path('schema/', CachedSpectacularAPIView.as_view(), name='schema'),
     path(
         'schema/swagger-ui/',
         SpectacularSwaggerView.as_view(url_name='sphinx_hosting_api:schema'),
@@ -1,12 +1,19 @@
-import os
-import tempfile
-from typing import List, Type, Optional
-
-from django.core.files.storage import FileSystemStorage
-from django.db.models import Model
+import hashlib
+import uuid
+from typing import Type, Tuple, Optional
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.db.models import Model, Prefetch, QuerySet, prefetch_related_objects
+from django.http import HttpResponseBase
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from django_filters import rest_framework as filters
 from django_filters.filters import Filter, CharFilter, NumberFilter
-from rest_framework import viewsets, permissions, mixins
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+from rest_framework import viewsets, permissions, mixins, serializers
 from rest_framework.decorators import action
 from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
@@ -22,18 +29,157 @@ from sphinx_hosting.models import (
     SphinxImage,
 )
 from sphinx_hosting.importers import SphinxPackageImporter
+from sphinx_hosting.logging import logger
+from sphinx_hosting.settings import SAVE_FAILED_UPLOADS
 
+from .pagination import IDCursorPagination
 from .permissions import ChangeProjectPermission, AddVersionPermission
 from .serializers import (
     ClassifierSerializer,
     ProjectSerializer,
+    ProjectListSerializer,
     ProjectRelatedLinkSerializer,
     VersionSerializer,
+    VersionListSerializer,
     VersionUploadSerializer,
     SphinxPageSerializer,
+    SphinxPageListSerializer,
     SphinxImageSerializer,
 )
 
+#: How long to cache the output of ``ProjectViewSet.latest_version``, in seconds
+LATEST_VERSION_CACHE_TIMEOUT: int = 60 * 60
+
+
+class ListSerializerMixin:
+    """
+    A viewset mixin that uses :py:attr:`list_serializer_class` instead of
+    ``serializer_class`` for the ``list`` action, so that list responses can
+    leave out the expensive fields that only the detail view needs.
+    """
+
+    list_serializer_class: Optional[Type[serializers.Serializer]] = None
+
+    def get_serializer_class(self) -> Type[serializers.Serializer]:
+        if self.action == 'list' and self.list_serializer_class is not None:  # type: ignore
+            return self.list_serializer_class
+        return super().get_serializer_class()  # type: ignore
+
+
+class ConditionalRetrieveMixin:
+    """
+    A viewset mixin for models with a ``modified`` timestamp (anything
+    derived from :py:class:`django_extensions.db.models.TimeStampedModel`)
+    that adds ``ETag`` and ``Last-Modified`` headers to ``retrieve``
+    responses, and answers conditional ``GET`` requests for unchanged objects
+    with a ``304 Not Modified`` without serializing the object.
+
+    Anything that changes what the object serializes to, including its
+    relations to other objects, must bump ``modified``.  Note that
+    ``QuerySet.update()`` and ``bulk_update()`` don't do that by themselves.
+    """
+
+    def retrieve(self, request: Request, *args, **kwargs) -> HttpResponseBase:
+        instance = self.get_object()  # type: ignore
+        etag = f'W/"{instance.pk}-{instance.modified.timestamp()}"'
+        last_modified = int(instance.modified.timestamp())
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=last_modified
+        )
+        if response is None:
+            serializer = self.get_serializer(instance)  # type: ignore
+            response = Response(serializer.data)
+        response.headers['ETag'] = etag
+        response.headers['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class ConditionalListMixin:
+    """
+    A viewset mixin for models with a ``modified`` timestamp that adds an
+    ``ETag`` (and, for non-empty pages, a ``Last-Modified``) header to
+    ``list`` responses, and answers conditional ``GET`` requests for unchanged
+    lists with a ``304 Not Modified`` without serializing any rows.
+
+    The ``ETag`` is built from the full request URL (so filters, paging and
+    host are all accounted for), the total count from the paginator, and the
+    pk and ``modified`` timestamp of each row on the current page.  We build
+    it from the rows we fetch for the page anyway, so it costs no extra
+    queries beyond what the paginator does.
+
+    Only use this on models whose list representation changes only when
+    their own rows change.
+    """
+
+    def list(self, request: Request, *args, **kwargs) -> HttpResponseBase:
+        queryset = self.filter_queryset(self.get_queryset())  # type: ignore
+        page = self.paginate_queryset(queryset)  # type: ignore
+        rows = list(page) if page is not None else list(queryset)
+        stamps = [(obj.pk, obj.modified.timestamp()) for obj in rows]
+        count = getattr(self.paginator, 'count', None)  # type: ignore
+        digest = hashlib.md5(
+            f'{request.build_absolute_uri()}|{count}|{stamps}'.encode('utf-8')
+        ).hexdigest()
+        etag = f'W/"{digest}"'
+        last_modified = int(max(stamp for _, stamp in stamps)) if stamps else None
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=last_modified
+        )
+        if response is None:
+            serializer = self.get_serializer(rows, many=True)  # type: ignore
+            if page is not None:
+                response = self.get_paginated_response(serializer.data)  # type: ignore
+            else:
+                response = Response(serializer.data)
+        response.headers['ETag'] = etag
+        if last_modified is not None:
+            response.headers['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+def project_scoped_filterset(prefix: str) -> Type[filters.FilterSet]:
+    """
+    Build a :py:class:`django_filters.rest_framework.FilterSet` base class
+    with the filters shared by everything that belongs to a
+    :py:class:`sphinx_hosting.models.Project`: project title, machine name,
+    and classifier name and ID.
+
+    Args:
+        prefix: the lookup path from the filtered model to its project's fields,
+            e.g. ``project__`` or ``version__project__``
+
+    Returns:
+        A FilterSet class to use as the base of the model's own FilterSet.
+    """
+
+    class ProjectScopedFilterSet(filters.FilterSet):
+
+        project_title: Filter = CharFilter(
+            field_name=f"{prefix}title",
+            lookup_expr="icontains",
+            help_text="Filter by project title [case insensitive, partial match]",
+        )
+        project_machine_name: Filter = CharFilter(
+            field_name=f"{prefix}machine_name",
+            lookup_expr="icontains",
+            help_text="Filter by project machine name [case insensitive, partial match]",
+        )
+        project_classifier: Filter = CharFilter(
+            field_name=f"{prefix}classifiers__name",
+            lookup_expr="icontains",
+            help_text="Filter by project classifier name [case insensitive, partial match]",
+        )
+        project_classifier_id: Filter = NumberFilter(
+            field_name=f"{prefix}classifiers",
+            help_text="Filter by project classifier ID.  This is faster than filtering by name.",
+        )
+
+    return ProjectScopedFilterSet
+
 
 class ClassifierFilter(filters.FilterSet):
 
@@ -45,7 +191,7 @@ class ClassifierFilter(filters.FilterSet):
 
     class Meta:
         model: Type[Model] = Classifier
-        fields: List[str] = ["name"]
+        fields: Tuple[str, ...] = ("name",)
 
 
 class ClassifierViewSet(viewsets.ModelViewSet):
@@ -78,49 +224,79 @@ class ProjectFilter(filters.FilterSet):
         lookup_expr="icontains",
         help_text="Filter by project classifier name [case insensitive, partial match]]",
     )
+    classifier_id: Filter = NumberFilter(
+        field_name="classifiers",
+        help_text="Filter by project classifier ID.  This is faster than filtering by name.",
+    )
 
     class Meta:
         model: Type[Model] = Project
-        fields: List[str] = ["title", "machine_name", "description", "classifier"]
+        fields: Tuple[str, ...] = ("title", "machine_name", "description", "classifier", "classifier_id")
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(ListSerializerMixin, viewsets.ModelViewSet):
 
     permission_classes = [
         permissions.IsAuthenticated,
         permissions.DjangoModelPermissions,
     ]
     serializer_class = ProjectSerializer
-    queryset = Project.objects.all()
+    list_serializer_class = ProjectListSerializer
+    # Prefetch the to-many relations the serializer renders so that listing
+    # projects doesn't cost a query per project per relation.
+    queryset = Project.objects.prefetch_related('classifiers')
     filterset_class = ProjectFilter
 
+    def get_queryset(self) -> QuerySet:
+        qs = super().get_queryset()
+        if self.action == 'latest_version':
+            # We only render the latest version, so skip the classifiers
+            # prefetch and load the version along with the project.  What the
+            # version's serializer needs is prefetched in latest_version(),
+            # and only when we don't have its output cached.
+            qs = qs.prefetch_related(None).select_related('latest_version')
+        elif self.action != 'list':
+            # We only need the pks of versions and links to build their URLs
+            qs = qs.prefetch_related(
+                Prefetch('versions', queryset=Version.objects.only('id', 'project')),
+                Prefetch(
+                    'related_links',
+                    queryset=ProjectRelatedLink.objects.only('id', 'project')
+                ),
+            )
+        return qs
+
     @action(detail=True)
     def latest_version(self, request: Request, pk: Optional[int] = None) -> Response:
         project = self.get_object()
-        serializer = VersionSerializer(
-            project.latest_version, context={"request": request}
+        version = project.latest_version
+        if version is None:
+            serializer = VersionSerializer(version, context={"request": request})
+            return Response(serializer.data)
+        # The key changes whenever the project gets a new latest version or
+        # that version is saved (which an import of it always does), so we
+        # never need to invalidate it explicitly.
+        key = "sphinx_hosting.api.latest_version.{}.{}.{}".format(
+            version.pk,
+            version.modified.timestamp(),
+            request.build_absolute_uri("/"),
         )
-        return Response(serializer.data)
+        data = cache.get(key)
+        if data is None:
+            prefetch_related_objects(
+                [version],
+                Prefetch("pages", queryset=SphinxPage.objects.only("id", "version")),
+                Prefetch("images", queryset=SphinxImage.objects.only("id", "version")),
+            )
+            serializer = VersionSerializer(version, context={"request": request})
+            data = dict(serializer.data)
+            cache.set(key, data, LATEST_VERSION_CACHE_TIMEOUT)
+        return Response(data)
 
 
-class VersionFilter(filters.FilterSet):
+class VersionFilter(project_scoped_filterset("project__")):
 
     project: Filter = NumberFilter()
-    project_title: Filter = CharFilter(
-        field_name="project__title",
-        lookup_expr="icontains",
-        help_text="Filter by project title [case insensitive, partial match]",
-    )
-    project_machine_name: Filter = CharFilter(
-        field_name="project__machine_name",
-        lookup_expr="icontains",
-        help_text="Filter by project machine name [case insensitive, partial match]",
-    )
-    project_classifier: Filter = CharFilter(
-        field_name="project__classifiers__name",
-        lookup_expr="icontains",
-        help_text="Filter by project classifier name [case insensitive, partial match]",
-    )
     version_number: Filter = CharFilter(
         lookup_expr="iexact",
         help_text="Filter by version number [case insensitive, exact match]",
@@ -133,19 +309,22 @@ class VersionFilter(filters.FilterSet):
 
     class Meta:
         model: Type[Model] = Version
-        fields: List[str] = [
+        fields: Tuple[str, ...] = (
             "project",
             "project_title",
             "project_machine_name",
             "project_classifier",
+            "project_classifier_id",
             "version",
             "version_number",
             "sphinx_version",
             "archived",
-        ]
+        )
 
 
 class VersionViewSet(
+    ConditionalListMixin,
+    ListSerializerMixin,
     mixins.RetrieveModelMixin,
     mixins.DestroyModelMixin,
     mixins.ListModelMixin,
@@ -161,9 +340,21 @@ class VersionViewSet(
         permissions.DjangoModelPermissions | ChangeProjectPermission,
     ]
     serializer_class = VersionSerializer
+    list_serializer_class = VersionListSerializer
     queryset = Version.objects.all()
     filterset_class = VersionFilter
 
+    def get_queryset(self) -> QuerySet:
+        qs = super().get_queryset()
+        if self.action != 'list':
+            # Pages in particular have large body columns, and we only need
+            # their pks to build the URLs in the ``pages`` and ``images`` lists
+            qs = qs.prefetch_related(
+                Prefetch('pages', queryset=SphinxPage.objects.only('id', 'version')),
+                Prefetch('images', queryset=SphinxImage.objects.only('id', 'version')),
+            )
+        return qs
+
 
 class VersionUploadView(APIView):
     """
@@ -199,19 +390,28 @@ class VersionUploadView(APIView):
     def post(self, request: Request) -> Response:
         serializer = VersionUploadSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        with tempfile.TemporaryDirectory() as tmpdir:
-            fs = FileSystemStorage(tmpdir)
-            filename = fs.save("docs.tar.gz", content=serializer.validated_data["file"])
-            path = os.path.join(fs.location, filename)
-            try:
-                version = SphinxPackageImporter().run(filename=path, force=True)
-            except Project.DoesNotExist as e:
-                return Response(
-                    {"status": "error", "message": str(e)},
-                )
-            except Exception:
-                os.rename(path, "/tmp/uploaded_file")
-                raise
+        uploaded = serializer.validated_data["file"]
+        # Django has already spooled the upload either to a temporary file on
+        # disk (large uploads) or to memory (small ones), so read it from
+        # there rather than copying it somewhere else first.
+        if isinstance(uploaded, TemporaryUploadedFile):
+            kwargs = {"filename": uploaded.temporary_file_path()}
+        else:
+            kwargs = {"file_obj": uploaded}
+        try:
+            version = SphinxPackageImporter().run(force=True, **kwargs)
+        except Project.DoesNotExist as e:
+            return Response(
+                {"status": "error", "message": str(e)},
+            )
+        except Exception:
+            if SAVE_FAILED_UPLOADS:
+                # Keep a copy of the tarball that broke the importer for
+                # debugging, under a name unique to this request
+                uploaded.seek(0)
+                name = default_storage.save(f"failed_uploads/{uuid.uuid4()}.tar.gz", uploaded)
+                logger.error("version.upload.failed.unknown saved_to=%s", name)
+            raise
 
         data = {
             "status": "success",
@@ -221,26 +421,11 @@ class VersionUploadView(APIView):
         return Response(data, status=200)
 
 
-class SphinxPageFilter(filters.FilterSet):
+class SphinxPageFilter(project_scoped_filterset("version__project__")):
 
     project: Filter = NumberFilter(
         field_name="version__project", help_text="Filter by project ID"
     )
-    project_title: Filter = CharFilter(
-        field_name="version__project__title",
-        lookup_expr="icontains",
-        help_text="Filter by project title [case insensitive, partial match]",
-    )
-    project_machine_name: Filter = CharFilter(
-        field_name="version__project__machine_name",
-        lookup_expr="icontains",
-        help_text="Filter by project machine name [case insensitive, partial match]",
-    )
-    project_classifier: Filter = CharFilter(
-        field_name="version__project__classifiers__name",
-        lookup_expr="icontains",
-        help_text="Filter by project classifier name [case insensitive, partial match]",
-    )
     version: Filter = NumberFilter(help_text="Filter by version ID")
     version_number: Filter = CharFilter(
         field_name="version__version",
@@ -266,21 +451,26 @@ class SphinxPageFilter(filters.FilterSet):
 
     class Meta:
         model: Type[Model] = SphinxPage
-        fields: List[str] = [
+        fields: Tuple[str, ...] = (
             "project",
             "project_title",
             "project_machine_name",
             "project_classifier",
+            "project_classifier_id",
             "version",
             "version_number",
             "archived",
             "title",
             "relative_path",
             "sphinx_version",
-        ]
+        )
 
 
-class SphinxPageViewSet(viewsets.ReadOnlyModelViewSet):
+class SphinxPageViewSet(
+    ConditionalRetrieveMixin,
+    ListSerializerMixin,
+    viewsets.ReadOnlyModelViewSet
+):
     """
     This is a read-only model set for
     :py:class:`sphinx_hosting.models.SphinxPage` models.  It is purposely
@@ -292,31 +482,37 @@ class SphinxPageViewSet(viewsets.ReadOnlyModelViewSet):
     """
 
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = IDCursorPagination
     serializer_class = SphinxPageSerializer
-    queryset = SphinxPage.objects.all()
+    list_serializer_class = SphinxPageListSerializer
+    queryset = SphinxPage.objects.prefetch_related(
+        Prefetch(
+            'previous_page',
+            queryset=SphinxPage.objects.only('id', 'next_page')
+        ),
+    )
     filterset_class = SphinxPageFilter
 
+    def get_queryset(self) -> QuerySet:
+        qs = super().get_queryset()
+        if self.action == 'list':
+            # SphinxPageListSerializer doesn't render these, and they're big
+            qs = qs.defer(
+                'content',
+                'orig_body',
+                'body',
+                'orig_local_toc',
+                'local_toc',
+                'orig_global_toc',
+            )
+        return qs
+
 
-class SphinxImageFilter(filters.FilterSet):
+class SphinxImageFilter(project_scoped_filterset("version__project__")):
 
     project: Filter = NumberFilter(
         field_name="version__project", help_text="Filter by project ID"
     )
-    project_title: Filter = CharFilter(
-        field_name="version__project__title",
-        lookup_expr="icontains",
-        help_text="Filter by project title [case insensitive, partial match]",
-    )
-    project_machine_name: Filter = CharFilter(
-        field_name="version__project__machine_name",
-        lookup_expr="icontains",
-        help_text="Filter by project machine name [case insensitive, partial match]",
-    )
-    project_classifier: Filter = CharFilter(
-        field_name="version__project__classifiers__name",
-        lookup_expr="icontains",
-        help_text="Filter by project classifier name [case insensitive, partial match]",
-    )
     version: Filter = NumberFilter(help_text="Filter by version ID")
     version_number: Filter = CharFilter(
         field_name="version__version",
@@ -338,7 +534,7 @@ class SphinxImageFilter(filters.FilterSet):
 
     class Meta:
         model: Type[Model] = SphinxImage
-        fields: List[str] = [
+        fields: Tuple[str, ...] = (
             "project",
             "version",
             "sphinx_version",
@@ -346,12 +542,16 @@ class SphinxImageFilter(filters.FilterSet):
             "project_title",
             "project_machine_name",
             "project_classifier",
+            "project_classifier_id",
             "version_number",
             "orig_path",
-        ]
+        )
 
 
-class SphinxImageViewSet(viewsets.ReadOnlyModelViewSet):
+class SphinxImageViewSet(
+    ConditionalRetrieveMixin,
+    viewsets.ReadOnlyModelViewSet
+):
     """
     This is a read-only model set for
     :py:class:`sphinx_hosting.models.SphinxImage` models.  It is purposely
@@ -361,47 +561,41 @@ class SphinxImageViewSet(viewsets.ReadOnlyModelViewSet):
     """
 
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = IDCursorPagination
     serializer_class = SphinxImageSerializer
     queryset = SphinxImage.objects.all()
     filterset_class = SphinxImageFilter
 
+    def get_queryset(self) -> QuerySet:
+        qs = super().get_queryset()
+        if self.action == 'list':
+            # Only load what SphinxImageSerializer renders
+            qs = qs.only('id', 'version', 'orig_path', 'size')
+        return qs
+
 
-class ProjectRelatedLinkFilter(filters.FilterSet):
+class ProjectRelatedLinkFilter(project_scoped_filterset("project__")):
 
     title: Filter = CharFilter(
         lookup_expr="icontains",
         help_text="Filter by link title, [case insensitive, partial match]",
     )
-    project_title: Filter = CharFilter(
-        field_name="project__title",
-        lookup_expr="icontains",
-        help_text="Filter by project title, [case insensitive, partial match]",
-    )
-    project_machine_name: Filter = CharFilter(
-        field_name="project__machine_name",
-        lookup_expr="icontains",
-        help_text="Filter by project machine name, [case insensitive, partial match]",
-    )
     project_description: Filter = CharFilter(
         field_name="project__description",
         lookup_expr="icontains",
         help_text="Filter by project description, [case insensitive, partial match]",
     )
-    project_classifier: Filter = CharFilter(
-        field_name="project__classifiers__name",
-        lookup_expr="icontains",
-        help_text="Filter by project classifier name [case insensitive, partial match]]",
-    )
 
     class Meta:
         model: Type[Model] = ProjectRelatedLink
-        fields: List[str] = [
+        fields: Tuple[str, ...] = (
             "title",
             "project_title",
             "project_machine_name",
             "project_description",
-            "project_classifier"
-        ]
+            "project_classifier",
+            "project_classifier_id",
+        )
 
 
 class ProjectRelatedLinkViewSet(viewsets.ModelViewSet):
@@ -413,3 +607,34 @@ class ProjectRelatedLinkViewSet(viewsets.ModelViewSet):
     serializer_class = ProjectRelatedLinkSerializer
     queryset = ProjectRelatedLink.objects.all()
     filterset_class = ProjectRelatedLinkFilter
+
+
+class CachedSpectacularAPIView(SpectacularAPIView):
+    """
+    A :py:class:`drf_spectacular.views.SpectacularAPIView` that keeps the
+    OpenAPI schema in the Django cache instead of generating it on every
+    request.  Generating it walks every viewset, serializer and filterset in
+    the API, and the result only changes when the code does.
+
+    There is one cache entry per API version and output format, so the
+    number of keys is bounded.  We only cache public schemas
+    (``serve_public``, the default) requested without a ``lang`` or
+    ``version`` query parameter; everything else is generated per request.
+    """
+
+    #: How long to cache the schema, in seconds
+    schema_cache_timeout: int = 60 * 60
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request: Request, *args, **kwargs) -> Response:
+        if not self.serve_public or "lang" in request.GET or "version" in request.GET:
+            return super().get(request, *args, **kwargs)
+        version = self.api_version or request.version
+        key = f"sphinx_hosting.api.schema.{version}.{request.accepted_renderer.format}"
+        cached = cache.get(key)
+        if cached is None:
+            response = super().get(request, *args, **kwargs)
+            cached = (response.data, response["Content-Disposition"])
+            cache.set(key, cached, self.schema_cache_timeout)
+        data, disposition = cached
+        return Response(data=data, headers={"Content-Disposition": disposition})
@@ -11,7 +11,7 @@ class MachineNameField(models.SlugField):
     characters.  "." is not uncommon in some project names, especially if
     the project is named after the website domain it hosts.
     """
-    default_validators = [validate_machine_name]
+    default_validators = (validate_machine_name,)
 
     def formfield(self, **kwargs):
         return super().formfield(
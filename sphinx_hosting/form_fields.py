@@ -12,4 +12,4 @@ class MachineNameField(forms.SlugField):
     The difference this field and :py:class:`django.forms.SlugField` is that
     this field will allow "-" characters in the value
     """
-    default_validators = [validate_machine_name]
+    default_validators = (validate_machine_name,)
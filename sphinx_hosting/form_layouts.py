@@ -0,0 +1,36 @@
+from crispy_forms.helper import FormHelper
+from crispy_forms.layout import ButtonHolder, Submit
+from django import forms
+
+
+#: The "Save" button row at the bottom of our model forms.  Layout objects
+#: aren't changed by rendering, so all our layouts share this one.
+SAVE_BUTTON: ButtonHolder = ButtonHolder(
+    Submit('submit', 'Save', css_class='btn btn-primary'),
+    css_class='d-flex flex-row justify-content-end button-holder'
+)
+
+#: The widget for project descriptions.  Django deep-copies widgets into each
+#: form field, so one module-level instance is safe to share between forms.
+DESCRIPTION_WIDGET: forms.Textarea = forms.Textarea(attrs={'cols': 50, 'rows': 3})
+
+
+def horizontal_form_helper(form_method: str = 'post') -> FormHelper:
+    """
+    Return a :py:class:`crispy_forms.helper.FormHelper` set up for our
+    horizontal forms: labels in a ``col-lg-3`` column to the left of the
+    fields.  The caller adds the layout and, if it is static, the
+    ``form_action``.
+
+    Keyword Args:
+        form_method: the HTTP method the form submits with
+
+    Returns:
+        The helper.
+    """
+    helper = FormHelper()
+    helper.form_class = 'form-horizontal'
+    helper.label_class = 'col-lg-3'
+    helper.field_class = 'col'
+    helper.form_method = form_method
+    return helper
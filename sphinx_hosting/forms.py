@@ -1,3 +1,5 @@
+from copy import copy
+from functools import lru_cache
 from typing import Type, cast
 
 from crispy_forms.helper import FormHelper
@@ -5,40 +7,108 @@ from crispy_forms.layout import Submit, Layout, Field, Fieldset, HTML, ButtonHol
 
 from crispy_forms.bootstrap import FieldWithButtons
 from django import forms
+from django.db import transaction
 from django.db.models import Model
-from django.urls import reverse, reverse_lazy
+from django.urls import get_script_prefix, reverse, reverse_lazy
+from django.utils.functional import lazy
 from haystack.forms import SearchForm
 
+from .form_layouts import DESCRIPTION_WIDGET, SAVE_BUTTON, horizontal_form_helper
 from .logging import logger
 from .search_indexes import SphinxPageIndex
 from .models import Project, ProjectRelatedLink, Version
 
 
-class GlobalSearchForm(SearchForm):
+@lru_cache(maxsize=1024)
+def _cached_reverse(script_prefix: str, viewname: str, *args: str) -> str:
+    return reverse(viewname, args=args or None)
+
+
+def cached_reverse(viewname: str, *args: str) -> str:
+    """
+    Like :py:func:`django.urls.reverse`, but remember the result, so that we
+    only walk the URL resolver once per URL.  Our form actions are
+    rebuilt every time a form is instantiated, but the URLs only depend on
+    the view name, its arguments and the script prefix.
+
+    Args:
+        viewname: the name of the view to reverse
+        *args: the positional arguments for the URL
+
+    Returns:
+        The URL path.
+    """
+    return _cached_reverse(get_script_prefix(), viewname, *args)
+
+
+class SharedHelperMixin:
+    """
+    A form mixin that builds the form's
+    :py:class:`crispy_forms.helper.FormHelper`, layout and all, once per form
+    class instead of once per form instance.  Subclasses must implement a
+    ``build_helper()`` classmethod that returns the helper.
+
+    Each instance gets a shallow copy of the class's helper as
+    ``self.helper``, with its own ``inputs`` and ``attrs``, so it can set
+    things like ``form_action`` or call ``add_input()`` without affecting any
+    other instance.  The ``Layout`` is shared by every instance: don't change
+    it in place.  To give one instance a different layout, assign a new
+    ``Layout`` to ``self.helper.layout``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.helper = self.get_helper()
+
+    @classmethod
+    def get_helper(cls) -> FormHelper:
+        """
+        Return a copy of our class's helper, building it first with
+        ``build_helper()`` if need be.
+
+        Returns:
+            A :py:class:`crispy_forms.helper.FormHelper` for a form instance.
+        """
+        # Look only in our own class __dict__ so that subclasses with their
+        # own build_helper() don't end up with their parent's helper
+        helper = cls.__dict__.get('_helper')
+        if helper is None:
+            helper = cls.build_helper()  # type: ignore
+            cls._helper = helper
+        instance_helper = copy(helper)
+        # These are the only mutable things on the helper besides the
+        # layout, so give each instance its own
+        instance_helper.inputs = list(helper.inputs)
+        instance_helper.attrs = dict(helper.attrs)
+        return instance_helper
+
+
+class GlobalSearchForm(SharedHelperMixin, SearchForm):
     """
     This is the search form at the top of the sidebar, underneath the logo.  It is
     a subclass of :py:class:`haystack.forms.SearchForm`, and does a search of our
     haystack backend.
     """
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.helper = FormHelper()
-        self.helper.form_class = 'form-horizontal px-3'
-        self.helper.form_method = 'get'
-        self.helper.form_show_labels = False
+    @classmethod
+    def build_helper(cls) -> FormHelper:
+        helper = FormHelper()
+        helper.form_class = 'form-horizontal px-3'
+        helper.form_method = 'get'
+        helper.form_show_labels = False
         # This is a reverse_lazy on purpose because the form gets instantiated as
         # the urlpatterns are being made
-        self.helper.form_action = reverse_lazy('sphinx_hosting:search')
-        self.helper.layout = Layout(
+        helper.form_action = reverse_lazy('sphinx_hosting:search')
+        helper.layout = Layout(
             FieldWithButtons(
                 Field('q', css_class='text-dark', placeholder='Search'),
                 HTML('<button type="submit" class="btn btn-primary"><span class="bi bi-search"></span></button>')
             )
         )
+        return helper
 
 
-class ProjectCreateForm(forms.ModelForm):
+class ProjectCreateForm(SharedHelperMixin, forms.ModelForm):
     """
     This is the form we use to create a new
     :py:class:`sphinx_hosting.models.Project`.  The difference between this and
@@ -48,26 +118,24 @@ class ProjectCreateForm(forms.ModelForm):
     project is created.
     """
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.helper = FormHelper()
-        self.helper.form_class = 'form-horizontal'
-        self.helper.label_class = 'col-lg-3'
-        self.helper.field_class = 'col'
-        self.helper.form_method = 'post'
-        self.helper.form_action = reverse('sphinx_hosting:project--create')
-        self.helper.layout = Layout(
+    #: Where we POST to.  This is lazy because forms.py is imported while the
+    #: URLconf is still loading.
+    form_action = lazy(cached_reverse, str)('sphinx_hosting:project--create')
+
+    @classmethod
+    def build_helper(cls) -> FormHelper:
+        helper = horizontal_form_helper()
+        helper.form_action = cls.form_action
+        helper.layout = Layout(
             Fieldset(
                 '',
                 Field('title'),
                 Field('machine_name'),
                 Field('description'),
             ),
-            ButtonHolder(
-                Submit('submit', 'Save', css_class='btn btn-primary'),
-                css_class='d-flex flex-row justify-content-end button-holder'
-            )
+            SAVE_BUTTON,
         )
+        return helper
 
     class Meta:
         model: Type[Model] = Project
@@ -82,11 +150,11 @@ class ProjectCreateForm(forms.ModelForm):
             'modified'
         )
         widgets = {
-            'description': forms.Textarea(attrs={'cols': 50, 'rows': 3}),
+            'description': DESCRIPTION_WIDGET,
         }
 
 
-class ProjectUpdateForm(forms.ModelForm):
+class ProjectUpdateForm(SharedHelperMixin, forms.ModelForm):
     """
     This is the form we use to update an existing
     :py:class:`sphinx_hosting.models.Project`.  The difference between this and
@@ -98,60 +166,20 @@ class ProjectUpdateForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.helper = FormHelper()
-        self.helper.form_class = 'form-horizontal'
-        self.helper.label_class = 'col-lg-3'
-        self.helper.field_class = 'col'
-        self.helper.form_method = 'post'
-        self.helper.form_action = reverse('sphinx_hosting:project--update', args=[self.instance.machine_name])
-        self.helper.layout = Layout(
-            Fieldset(
-                '',
-                Field('title'),
-                Field('description'),
-            ),
-            ButtonHolder(
-                Submit('submit', 'Save', css_class='btn btn-primary'),
-                css_class='d-flex flex-row justify-content-end button-holder'
-            )
-        )
-
-    class Meta:
-        model: Type[Model] = Project
-        fields = (
-            'title',
-            'description',
-        )
-        widgets = {
-            'description': forms.Textarea(attrs={'cols': 50, 'rows': 3}),
-        }
+        self.helper.form_action = cached_reverse('sphinx_hosting:project--update', self.instance.machine_name)
 
-
-class ProjectReadonlyUpdateForm(forms.ModelForm):
-    """
-    This is the form we use to on the
-    :py:class:`sphinx_hosting.views.ProjectDetailView` to show the viewer the
-    project title and description.  The difference between this and
-    :py:class:`ProjectUpdateForm` is that all the fields are readonly, and there
-    are no submit buttons.  We're doing it this way instead of just rendering a
-    non-form widget so that we can ensure that the page looks the same.
-    """
-
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.fields['title'].widget.attrs['readonly'] = True
-        self.helper = FormHelper()
-        self.helper.form_class = 'form-horizontal'
-        self.helper.label_class = 'col-lg-3'
-        self.helper.field_class = 'col'
-        self.helper.form_method = 'get'
-        self.helper.layout = Layout(
+    @classmethod
+    def build_helper(cls) -> FormHelper:
+        helper = horizontal_form_helper()
+        helper.layout = Layout(
             Fieldset(
                 '',
                 Field('title'),
                 Field('description'),
-            )
+            ),
+            SAVE_BUTTON,
         )
+        return helper
 
     class Meta:
         model: Type[Model] = Project
@@ -160,36 +188,27 @@ class ProjectReadonlyUpdateForm(forms.ModelForm):
             'description',
         )
         widgets = {
-            'description': forms.Textarea(
-                attrs={
-                    'cols': 50,
-                    'rows': 3,
-                    'readonly': 'readonly',
-                }
-            ),
+            'description': DESCRIPTION_WIDGET,
         }
 
 
-class ProjectRelatedLinkBaseForm(forms.ModelForm):
+class ProjectRelatedLinkBaseForm(SharedHelperMixin, forms.ModelForm):
 
     def __init__(self, *args, project_machine_name: str = None, **kwargs):
         super().__init__(*args, **kwargs)
-        self.helper = FormHelper()
-        self.helper.form_class = 'form-horizontal'
-        self.helper.label_class = 'col-lg-3'
-        self.helper.field_class = 'col'
-        self.helper.form_method = 'post'
-        self.helper.layout = Layout(
+
+    @classmethod
+    def build_helper(cls) -> FormHelper:
+        helper = horizontal_form_helper()
+        helper.layout = Layout(
             Fieldset(
                 '',
                 Field('title'),
                 Field('uri'),
             ),
-            ButtonHolder(
-                Submit('submit', 'Save', css_class='btn btn-primary'),
-                css_class='d-flex flex-row justify-content-end button-holder'
-            )
+            SAVE_BUTTON,
         )
+        return helper
 
     class Meta:
         model: Type[Model] = ProjectRelatedLink
@@ -203,9 +222,9 @@ class ProjectRelatedLinkCreateForm(ProjectRelatedLinkBaseForm):
 
     def __init__(self, *args, project: Project = None, **kwargs):
         super().__init__(*args, **kwargs)
-        self.helper.form_action = reverse(
+        self.helper.form_action = cached_reverse(
             'sphinx_hosting:projectrelatedlink--create',
-            args=[cast(Project, project).machine_name]
+            cast(Project, project).machine_name
         )
 
 
@@ -216,7 +235,7 @@ class ProjectRelatedLinkUpdateForm(ProjectRelatedLinkBaseForm):
         self.helper.form_action = self.instance.get_update_url()
 
 
-class VersionUploadForm(forms.Form):
+class VersionUploadForm(SharedHelperMixin, forms.Form):
     """
     This is the form on :py:class:`sphinx_hosting.views.ProjectDetailView` that
     allows the user to upload a new documentation set.
@@ -230,14 +249,17 @@ class VersionUploadForm(forms.Form):
 
     def __init__(self, *args, project: Project = None, **kwargs):
         super().__init__(*args, **kwargs)
-        self.helper = FormHelper()
-        self.helper.form_class = 'form'
-        self.helper.form_method = 'post'
         if project:
-            self.helper.form_action = reverse(
-                'sphinx_hosting:version--upload', kwargs={'slug': project.machine_name}
+            self.helper.form_action = cached_reverse(
+                'sphinx_hosting:version--upload', project.machine_name
             )
-        self.helper.layout = Layout(
+
+    @classmethod
+    def build_helper(cls) -> FormHelper:
+        helper = FormHelper()
+        helper.form_class = 'form'
+        helper.form_method = 'post'
+        helper.layout = Layout(
             Fieldset(
                 '',
                 Field('file'),
@@ -247,6 +269,7 @@ class VersionUploadForm(forms.Form):
                 css_class='d-flex flex-row justify-content-end button-holder'
             )
         )
+        return helper
 
 
 class VersionMakeLatestForm(forms.Form):
@@ -262,7 +285,11 @@ class VersionMakeLatestForm(forms.Form):
         """
         version_id = self.cleaned_data['version']
         try:
-            _ = Version.objects.get(pk=version_id)
+            # Keep the version around for :py:meth:`save`, along with the
+            # project and its current latest version, which we also need there
+            self._version = Version.objects.select_related(
+                'project__latest_version'
+            ).get(pk=version_id)
         except Version.DoesNotExist as e:
             raise forms.ValidationError("The specified version does not exist.") from e
         return version_id
@@ -271,13 +298,22 @@ class VersionMakeLatestForm(forms.Form):
         """
         Make the version the latest version.
         """
-        version = Version.objects.get(pk=self.cleaned_data['version'])
-        # Remove the old latest version from the search index
-        SphinxPageIndex().remove_version(version.project.latest_version)
-        version.project.latest_version = version
-        version.project.save()
-        # Add the new latest version to the search index
-        SphinxPageIndex().reindex_project(version.project)
+        version = self._version
+        old_latest = version.project.latest_version
+
+        def update_search_index():
+            index = SphinxPageIndex()
+            # Remove the old latest version from the search index
+            index.remove_version(old_latest)
+            # Add the new latest version to the search index
+            index.reindex_project(version.project)
+
+        with transaction.atomic():
+            version.project.latest_version = version
+            version.project.save()
+            # Don't hold the transaction open while we talk to the search
+            # backend, and don't touch the index at all if the save fails
+            transaction.on_commit(update_search_index)
         logger.info(
             'version.make-latest.success project_id=%s project_title=%s version=%s',
             version.project.id,
@@ -1,27 +1,35 @@
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import ExitStack
 from dataclasses import dataclass
 import fnmatch
+from functools import partial
 import io
-import json
-from pathlib import Path
-import re
+import multiprocessing
 import tarfile
-from typing import Any, Dict, IO, List, Optional, cast
-import urllib.parse
+from typing import Any, Dict, IO, Iterable, List, Optional, Tuple, cast
 
 
-from django.utils.text import slugify
-import lxml.html
-from lxml.etree import XML  #: pylint: disable=no-name-in-module
+from django.db import transaction
+from django.utils import timezone
+import orjson
 import semver
 
 from .exc import VersionAlreadyExists
 from .logging import logger
 from .models import Project, Version, SphinxPage, SphinxImage
+from .page_transforms import transform_page
 from .search_indexes import SphinxPageIndex
 from .settings import EXCLUDE_FROM_LATEST
 
 ImageMap = Dict[str, SphinxImage]
 
+#: How many bytes at a time to read from the Sphinx tarball
+TAR_BUFFER_SIZE: int = 1024 * 1024
+
+#: How many rows to insert or update per query when we bulk create or update
+#: images and pages
+BULK_BATCH_SIZE: int = 500
+
 
 @dataclass
 class PageTreeNode:
@@ -96,98 +104,109 @@ class SphinxPackageImporter:
         '&lt;no title&gt;'
     ]
 
-    def __init__(self) -> None:
+    def __init__(self, workers: int = 1) -> None:
+        #: How many worker processes to use to prepare page HTML.  ``1`` means
+        #: do it in this process, which is what you want inside web requests.
+        self.workers: int = workers
         #: Used to map original Sphinx image paths to our Django storage path
         self.image_map: ImageMap = {}
         #: Used to link pages to their parent pages, and to their next pages
         self.page_tree: Dict[str, PageTreeNode] = {}
-        self.name_map: Dict[str, str] = {}
         #: the contents of globalcontext.json
         self.config: Dict[str, Any] = {}
+        #: The start of the ``{% url %}`` tag we rewrite internal links to, up
+        #: to the page path.  Set from :py:attr:`config` by :py:meth:`read_package`
+        self._link_prefix: str = ''
 
-    def _get_file(self, package: tarfile.TarFile, filename: str) -> io.BufferedReader:
+    def read_package(
+        self,
+        package: tarfile.TarFile,
+        force: bool = False
+    ) -> Tuple[Version, List[Tuple[str, bytes]]]:
         """
-        Look through the member names in our tarfile ``package`` for
-        ``filename``, and return an open file descriptor on that file.
-
-        Note:
-          We have to do it this way instead of using ``package.getmember(name)``
-          because we don't know the name of the containing folder.
+        Read everything we need out of ``package`` in a single pass through
+        the archive, in archive order.  Tarfiles are sequential, and seeking
+        backwards in a gzipped one means decompressing it again from the
+        start, so we never go back.  This also means ``package`` can be
+        opened in stream mode (``r|*``).
+
+        As we go:
+
+        * When we reach ``globalcontext.json``, load it into :py:attr:`config`
+          and get our :py:class:`Version` with :py:meth:`get_version`.
+        * Upload images from ``_images/`` with :py:meth:`import_image`.  Any
+          that come before ``globalcontext.json`` are held in memory until
+          we have a version to attach them to.
+        * Read the ``.fjson`` page files into memory.  We can't import pages
+          until all the images are imported, because the page bodies refer to
+          the images, so we return them for :py:meth:`import_pages`.
 
         Args:
             package: the opened Sphinx documentation tarfile
-            filename: the name of the file we're looking for
-
-        Raises:
-            KeyError: no file named ``filename`` was found in the tarfile
-
-        Returns:
-            The opened file descriptor for our file.
-        """
-        if not self.name_map:
-            self.name_map = {str(Path(*Path(name).parts[1:])): name for name in package.getnames()}
-        if filename not in self.name_map:
-            raise KeyError(f'Sphinx docs TarFile has no file named "{filename}"')
-        return cast(io.BufferedReader, package.extractfile(self.name_map[filename]))
 
-    def _update_image_src(self, body: str) -> str:
-        """
-        Given an HTML body of a Sphinx page, update the ``<img src="path">``
-        references to template tag expressions that load the actual image URL
-        from the :py:class:`sphinx_hosting.models.SphinxImage` objects at render time.
-
-        We need to defer filling in the URL of the image until render time
-        because of things like storing images in S3 and using time-limited S3
-        auth parameters to retrieve the image from a private bucket.  Those
-        parameters expire typically after an hour, so if we don't defer figuring
-        out the URL for our images, we end up storing a stale URL.
-
-        Also deal with any lightboxes by converting them to the appropriate form
-        to work with Tabler lightboxes.
+        Keyword Args:
+            force: if ``True``, re-use an existing version, purging any docs and
+              images associated with it first
 
-        Args:
-            body: the HTML body of a Sphinx document
+        Raises:
+            KeyError: there is no ``globalcontext.json`` in the tarfile
 
         Returns:
-            ``body`` with its ``<img>`` urls and lightbox attributes updated
-        """
-        if not body:
-            return ''
-        html = lxml.html.fromstring(body)
-        images = html.cssselect('img')
-        for image in images:
-            src = re.sub(r'\.\./', '', image.attrib['src'])
-            if src in self.image_map:
-                image.attrib['src'] = f'{{% sphinximage_url {self.image_map[src].id} %}}'
-
-        # also deal with any lightbox <a>
-        lightboxes = html.cssselect('a[data-lightbox]')
-        for lightbox in lightboxes:
-            lightbox.attrib['data-fslightbox'] = lightbox.attrib['data-lightbox']
-            del lightbox.attrib['data-lightbox']
-            if 'data-title' in lightbox.attrib:
-                lightbox.attrib['data-caption'] = lightbox.attrib['data-title']
-                del lightbox.attrib['data-title']
-            src = re.sub(r'\.\./', '', lightbox.attrib['href'])
-            if src in self.image_map:
-                lightbox.attrib['href'] = f'{{% sphinximage_url {self.image_map[src].id} %}}'
-        return lxml.html.tostring(html).decode('utf-8')
-
-    def load_config(self, package: tarfile.TarFile) -> None:
+            The :py:class:`Version`, and a list of ``(path, raw JSON)`` tuples,
+            one for each page, where ``path`` is the page's path in the docs
+            without the ``.fjson`` extension.
         """
-        Load the ``globalcontext.json`` file for later reference.
-
-        Args:
-            package: the opened Sphinx documentation tarfile
-        """
-        self.config = json.loads(self._get_file(package, 'globalcontext.json').read())
+        version: Optional[Version] = None
+        pending_images: List[Tuple[str, int, bytes]] = []
+        pages: List[Tuple[str, bytes]] = []
+        for member in package:
+            if not member.isfile():
+                continue
+            # Strip the top level folder from the member name with plain string
+            # operations: building a Path and globbing it for every member of a
+            # large tarfile adds up.
+            name: str = member.name
+            if name.startswith('./'):
+                name = name[2:]
+            slash = name.find('/')
+            if slash == -1:
+                continue
+            name = name[slash + 1:]
+            basename_start = name.rfind('/') + 1
+            dirname = name[:basename_start - 1] if basename_start else ''
+            if name == 'globalcontext.json':
+                self.config = orjson.loads(cast(IO, package.extractfile(member)).read())
+                self._link_prefix = (
+                    "{% url 'sphinx_hosting:sphinxpage--detail' "
+                    f"project_slug='{self.config['project']}' version='{self.config['release']}' path='"
+                )
+                version = self.get_version(package, force=force)
+                for orig_path, size, content in pending_images:
+                    self.import_image(version, orig_path, size, io.BytesIO(content))
+                pending_images = []
+            elif dirname == '_images' or dirname.endswith('/_images'):
+                # Read the whole image in one go, since we know its size
+                content = cast(IO, package.extractfile(member)).read(member.size)
+                if version is None:
+                    pending_images.append((name, member.size, content))
+                else:
+                    self.import_image(version, name, member.size, io.BytesIO(content))
+            elif name.endswith('.fjson'):
+                if name.startswith('._', basename_start):
+                    # This is a Mac OS X AppleDouble hidden file.  Ignore it and
+                    # move on.  It just has MacOS specific metadata we don't care
+                    # about.
+                    continue
+                # files that contain page data will have a .fjson extension
+                pages.append((name[:-6], cast(IO, package.extractfile(member)).read()))
+        if version is None:
+            raise KeyError('Sphinx docs TarFile has no file named "globalcontext.json"')
+        return version, pages
 
     def get_version(self, package: tarfile.TarFile, force: bool = False) -> Version:
         """
-        Look in ``package`` for a member named ``globalcontext.json``, and load
-        that file as JSON.
-
-        Extract these things from that JSON:
+        Using the ``globalcontext.json`` data that :py:meth:`read_package`
+        loaded into :py:attr:`config`, extract these things:
 
             * the version string from the ``release`` key.
             * the ``machine_name`` of the :py:class:`Project` for this
@@ -233,225 +252,53 @@ class SphinxPackageImporter:
             v.save()
         return v
 
-    def import_images(self, package: tarfile.TarFile, version: Version) -> None:
+    def import_image(self, version: Version, orig_path: str, size: int, fd: IO) -> None:
         """
-        Import all images in our Sphinx documentation into the database before
-        importing any pages, then return a lookup dict for doing ``<img
-        src="image_path">`` replacements in the page bodies.
+        Upload an image from our Sphinx documentation to storage, and add an
+        unsaved :py:class:`sphinx_hosting.models.SphinxImage` for it to
+        :py:attr:`image_map`.  :py:meth:`save_images` saves them.  This has to
+        happen before we import any pages, so that we can do ``<img
+        src="image_path">`` replacements in the page bodies using
+        :py:attr:`image_map`.
 
         Args:
-            package: the opened Sphinx documentation tarfile
-            version: the :py:class:`Version` which which to associate our images
+            version: the :py:class:`Version` which which to associate our image
+            orig_path: the path to the image in the Sphinx docs
+            size: the size of the image in bytes
+            fd: the open image file
         """
-        for member in package.getmembers():
-            path = Path(*Path(member.name).parts[1:])
-            if path.match('_images/*'):
-                fd = package.extractfile(member)
-                orig_path: str = str(path)
-                image = SphinxImage(version=version, orig_path=orig_path)
-                image.file.save(orig_path, fd)
-                image.save()
-                self.image_map[orig_path] = image
-                logger.info(
-                    "%s.image.imported project=%s version=%s orig_path=%s url=%s id=%s",
-                    self.__class__.__name__,
-                    version.project.machine_name,
-                    version.version,
-                    image.orig_path,
-                    image.file.url,
-                    image.id
-                )
+        image = SphinxImage(version=version, orig_path=orig_path, size=size)
+        # Upload the file to storage, but leave creating the database row to
+        # save_images(), which creates them all at once
+        image.file.save(orig_path, fd, save=False)
+        self.image_map[orig_path] = image
 
-    def _fix_page_title(self, path: str, data: Dict[str, Any]) -> None:
+    def save_images(self, version: Version) -> None:
         """
-        Ensure that there is a ``title`` key in ``data``, the JSON data from our
-        .fjson file.  Some special pages don't have a ``title`` key in their
-        JSON data, so we supply one based on their filename, or by copying
-        another key from ``data``.
+        Create the database rows for all the images in :py:attr:`image_map`,
+        in bulk.  After this, every image in :py:attr:`image_map` has its
+        ``id``, which we need when updating the page bodies.
 
         Args:
-            path: the file path in the tarfile data: the JSON data from our file
-        """
-        if 'title' not in data:
-            data['title'] = 'UNKNOWN'
-        if path in SphinxPage.SPECIAL_PAGES:
-            data['title'] = SphinxPage.SPECIAL_PAGES[path]
-        if data['title'] in self.ODD_TITLES:
-            data['title'] = path
-        if 'title' not in data:
-            # Some of the special pages don't have 'title' keys
-            if 'indextitle' in data:
-                data['title'] = data['indextitle']
-            else:
-                data['title'] = SphinxPage.SPECIAL_PAGES[path]
-
-    def _fix_link_hrefs(self, path: str, body: str) -> str:
-        """
-        Given an HTML body of a Sphinx page, update the ``<a href="path">``
-        references for "path" to be rendered at page render time.  If we don't
-        do this, a lot of links won't work, because they do
-        index page, instead of being relative to the root of the docs, and won't
-        work.
-
-        Args:
-            path: the path to the current page
-            body: the HTML body of a Sphinx document
-
-        Returns:
-            ``body`` with its ``<a>`` urls and updated
+            version: the :py:class:`Version` with which our images are associated
         """
-        if not body:
-            return ''
-
-        # Parse the HTML body into an lxml tree
-        html = lxml.html.fromstring(body)
-
-        # Find all internal references
-        links = html.cssselect('a.reference.internal')
-
-        # For each link, update its URL to be rendered at page render time
-        for link in links:
-            href = link.attrib['href']
-            anchor = None
-            if '#' in href:
-                href, anchor = href.split('#')
-            if href.endswith('/'):
-                href = href[:-1]
-            # To deal with relative links, we need to know our current path
-            # and then compute the absolute path from that.
-            levels = href.count('../')
-            if levels:
-                href = re.sub('^(../)*', '', href)
-                href = '/'.join(path.split('/')[:-(levels)] + [href])
-            link.attrib['href'] = "{{% url 'sphinx_hosting:sphinxpage--detail' project_slug='{}' version='{}' path='{}' %}}".format(  # noqa:E501  # pylint: disable=line-too-long
-                self.config['project'],
-                self.config['release'],
-                href
+        images = list(self.image_map.values())
+        SphinxImage.objects.bulk_create(images, batch_size=BULK_BATCH_SIZE)
+        if any(image.pk is None for image in images):
+            # Not all databases give us back the ids of bulk created rows
+            ids = dict(version.images.values_list('orig_path', 'id'))
+            for image in images:
+                image.pk = ids[image.orig_path]
+        for image in images:
+            logger.info(
+                "%s.image.imported project=%s version=%s orig_path=%s url=%s id=%s",
+                self.__class__.__name__,
+                version.project.machine_name,
+                version.version,
+                image.orig_path,
+                image.file.url,
+                image.id
             )
-            if anchor:
-                link.attrib['href'] += f'#{anchor}'
-
-        # Return the updated HTML body
-        return lxml.html.tostring(html).decode('utf-8')
-
-    def _fix_page_body(self, path: str, data: Dict[str, Any]) -> None:
-        """
-        Do any work needed to prepare the page body before inserting into the
-        database.  This means:
-
-        * Ensure the ``body`` key exists in ``data``
-        * Update the ``img`` sources to point to our Django storage location.
-          We uploaded them to our storage during :py:meth:`import_images`.
-        * Update the ``href``s for any ``<a>`` links to be rendered at page
-          render time.
-        * Update the ``<table>``s to have the CSS classes we need for them to
-          display nicely.
-
-        Args:
-            path: the path to the current page
-            data: the JSON data from our file
-        """
-        if 'body' not in data or data['body'] is None:
-            # Ensure we always have data['body'] defined as a string, for when
-            # we create the SphinxPage, below
-            data['body'] = ''
-        data['orig_body'] = data['body']
-        if data['body']:
-            # Update the img src for any images in data['body'] for to point to our
-            # Django storage locations
-            data['body'] = self._update_image_src(data['body'])
-            # Update the hrefs for any <a> links to be absolute.  The relative
-            # paths we get from Sphinx end up being relative to the Sphinx index
-            # document instead of to the root of the docs
-            data['body'] = self._fix_link_hrefs(path, data['body'])
-            html = lxml.html.fromstring(data['body'])
-            # remove the first <h1> -- we'll display the page title another way
-            first_h1 = html.cssselect('h1')
-            if first_h1:
-                first_h1[0].getparent().remove(first_h1[0])
-            # Fix our tables to look better
-            tables = html.cssselect('table')
-            for table in tables:
-                wrapper = XML('<div class="table-responsive"></div>')
-                parent = table.getparent()
-                parent.append(wrapper)
-                wrapper.insert(0, table)
-                table.classes.add('table')
-                table.classes.add('table-striped')
-                table.classes.add('border')
-                for tr in table.cssselect('thead > tr'):
-                    tr.classes.discard('row-even')
-                    tr.classes.discard('row-odd')
-                for tr in table.cssselect('th'):
-                    tr.classes.discard('head')
-                    tr.classes.add('p-2')
-                for tr in table.cssselect('tbody > tr'):
-                    tr.classes.discard('row-even')
-                    tr.classes.discard('row-odd')
-                for div in table.cssselect('tbody > tr div.line'):
-                    div.classes.discard('line')
-                    div.classes.add('text-start')
-                for div in table.cssselect('tbody > tr p'):
-                    div.classes.add('text-start')
-            data['body'] = lxml.html.tostring(html).decode('utf-8')
-            # Unescape our template tags after lxml has converted our {% %}
-            # to entities.
-            tags = [m.group() for m in re.finditer(r'{%%20.*?%20%}', data['body'])]
-            tags.extend([m.group() for m in re.finditer(r'%7B%%20.*?%20%%7D', data['body'])])
-            for tag in tags:
-                data['body'] = data['body'].replace(tag, urllib.parse.unquote(tag))
-            # Convert the weird paragraph symbols to actual paragraph symbols
-            data['body'] = re.sub(r'#61633;', r'para;', data['body'])
-
-    def _fix_toc(self, data: Dict[str, Any]) -> None:
-        """
-        Update our page's local table of contents (``data['toc']`) to have the CSS
-        classes we need in order for it to display properly.
-
-        Args:
-            data: the decoded JSON data of the sphinx page
-        """
-        if 'toc' not in data:
-            return
-        data['orig_toc'] = data['toc']
-        html = lxml.html.fromstring(data['toc'])
-        ul_first = html.cssselect('ul:first-child')[0]
-        # Turn the first <ul> into a tabler vertical nav
-        ul_first.classes.add('nav-vertical')
-        # Turn all <uls> into nav-pills and nav
-        for ul in html.cssselect('ul'):
-            ul.classes.add('nav')
-            ul.classes.add('nav-pills')
-        # Make all list items into nav-items
-        for li in html.cssselect('li'):
-            li.classes.add('nav-item')
-        # Make <a> into nav-links
-        for link in html.cssselect('a'):
-            link.classes.add('nav-link')
-        # Now make the embedded uls collapsable
-        for ul in html.cssselect('li > ul'):
-            wrapper = XML('<div class="d-flex flex-row justify-content-between align-items-center"></div>')
-            link = ul.getprevious()
-            link.addprevious(wrapper)
-            wrapper.insert(0, link)
-            target = f'menu-{slugify(link.text_content())}'
-            wrapper.append(XML(
-                '<a class="toc__toggle nav-link-toggle" data-bs-toggle="collapse" '
-                f'aria-expanded="false" data-bs-target="#{target}"></a>'
-            ))
-            ul.attrib['id'] = target
-            ul.classes.add('collapse')
-        try:
-            link = html.cssselect('a:nth-child(2)')[0]
-            link.attrib['aria-expanded'] = 'true'
-        except IndexError:
-            pass
-        try:
-            ul = html.cssselect('li:first-child ul')[0]
-            ul.classes.add('show')
-        except IndexError:
-            pass
-        data['toc'] = lxml.html.tostring(html).decode('utf-8')
 
     def _update_page_tree(
         self,
@@ -479,56 +326,75 @@ class SphinxPackageImporter:
             next_title=next_title
         )
 
-    def import_pages(self, package: tarfile.TarFile, version: Version) -> None:
+    def import_pages(
+        self,
+        pages: List[Tuple[str, bytes]],
+        version: Version,
+        pool: Optional[Executor] = None
+    ) -> None:
         """
-        Import a all pages from ``package`` into the database as
+        Import all pages from our Sphinx documentation into the database as
         :py:class:`sphinx_hosting.models.SphinxPage` objects, associating them
         with :py:class:`Version` ``version``.
 
+        The HTML munging for each page is done by
+        :py:func:`sphinx_hosting.page_transforms.transform_page`, in ``pool``
+        if we're given one.
+
         Args:
-            package: the tarfile of the sphinx docs
+            pages: ``(path, raw JSON)`` tuples for our pages, as returned by
+                :py:meth:`read_package`
             version: the :py:class:`Version` object to associated data
 
-        Returns:
-            The page linkage tree for consumption by :py:meth:`link_pages`.
+        Keyword Args:
+            pool: if not ``None``, prepare the pages in this executor
         """
-        for member in package.getmembers():
-            path: str = str(Path(*Path(member.name).parts[1:]))
-            if path.split('/')[-1].startswith('._'):
-                # This is a Mac OS X AppleDouble hidden file.  Ignore it and
-                # move on.  It just has MacOS specific metadata we don't care
-                # about.
-                continue
-            if path.endswith('.fjson'):
-                # files that contain page data will have a .fjson extension
-                path = path.replace('.fjson', '')
-                fd = cast(io.BufferedReader, package.extractfile(member))
-                data = json.loads(fd.read())
-                self._fix_page_title(path, data)
-                self._fix_page_body(path, data)
-                self._fix_toc(data)
-                page = SphinxPage(
-                    version=version,
-                    relative_path=path,
-                    content=json.dumps(data),
-                    title=data['title'],
-                    orig_body=data['orig_body'],
-                    body=data['body'],
-                    orig_local_toc=data['orig_toc'] if 'orig_toc' in data else None,
-                    local_toc=data['toc'] if 'toc' in data else None,
-                    orig_global_toc=data['globaltoc'] if 'globaltoc' in data else None
-                )
-                page.save()
-                self._update_page_tree(page, data)
-                logger.info(
-                    "%s.page.imported project=%s version=%s relpath=%s title=%s id=%s",
-                    self.__class__.__name__,
-                    version.project.machine_name,
-                    version.version,
-                    page.relative_path,
-                    page.title,
-                    page.id
-                )
+        objs: List[SphinxPage] = []
+        # Give transform_page() only plain data, so that it pickles cheaply
+        # and never drags our models or database state into a worker
+        transform = partial(
+            transform_page,
+            image_ids={orig_path: image.pk for orig_path, image in self.image_map.items()},
+            link_prefix=self._link_prefix,
+            special_pages=dict(SphinxPage.SPECIAL_PAGES),
+            odd_titles=tuple(self.ODD_TITLES),
+        )
+        results: Iterable[Tuple[str, Dict[str, Any], str]]
+        if pool is not None and len(pages) > 1:
+            results = list(pool.map(transform, pages, chunksize=16))
+        else:
+            results = map(transform, pages)
+        for path, data, content in results:
+            page = SphinxPage(
+                version=version,
+                relative_path=path,
+                content=content,
+                title=data['title'],
+                orig_body=data['orig_body'],
+                body=data['body'],
+                orig_local_toc=data['orig_toc'] if 'orig_toc' in data else None,
+                local_toc=data['toc'] if 'toc' in data else None,
+                orig_global_toc=data['globaltoc'] if 'globaltoc' in data else None
+            )
+            objs.append(page)
+            self._update_page_tree(page, data)
+        SphinxPage.objects.bulk_create(objs, batch_size=BULK_BATCH_SIZE)
+        if any(page.pk is None for page in objs):
+            # Not all databases give us back the ids of bulk created rows, but
+            # link_pages() needs them
+            ids = dict(version.pages.values_list('relative_path', 'id'))
+            for page in objs:
+                page.pk = ids[page.relative_path]
+        for page in objs:
+            logger.info(
+                "%s.page.imported project=%s version=%s relpath=%s title=%s id=%s",
+                self.__class__.__name__,
+                version.project.machine_name,
+                version.version,
+                page.relative_path,
+                page.title,
+                page.id
+            )
 
     def link_pages(self) -> None:
         """
@@ -539,34 +405,50 @@ class SphinxPackageImporter:
         Args:
             tree: the page linkage tree
         """
-        for link in self.page_tree.values():
+        tree = self.page_tree
+        pages: List[SphinxPage] = []
+        # bulk_update() doesn't bump ``modified`` for us, but the API's ETags
+        # depend on it: linking changes a page's parent and next page, and
+        # the previous page of whatever page it links to
+        now = timezone.now()
+        for link in tree.values():
             page = link.page
+            page.modified = now
+            pages.append(page)
             logger.info(
                 "%s.page.linking relpath=%s title=%s id=%s",
                 self.__class__.__name__,
                 page.relative_path,
                 page.title,
-                page.id
+                page.pk
             )
+            # Set the foreign key ids directly: we only need the ids for
+            # bulk_update(), and this skips the related object descriptors
             if link.parent_title:
-                page.parent = self.page_tree[link.parent_title].page
+                parent = tree[link.parent_title].page
+                page.parent_id = parent.pk
                 logger.info(
                     "%s.page.linked-parent relpath=%s title=%s parent=%s",
                     self.__class__.__name__,
                     page.relative_path,
                     page.title,
-                    page.parent.title
+                    parent.title
                 )
             if link.next_title:
-                page.next_page = self.page_tree[link.next_title].page
+                next_page = tree[link.next_title].page
+                page.next_page_id = next_page.pk
                 logger.info(
                     "%s.page.linked-next relpath=%s title=%s next=%s",
                     self.__class__.__name__,
                     page.relative_path,
                     page.title,
-                    page.next_page.title
+                    next_page.title
                 )
-            page.save()
+        SphinxPage.objects.bulk_update(
+            pages,
+            ['parent', 'next_page', 'modified'],
+            batch_size=BULK_BATCH_SIZE
+        )
 
     def run(
         self,
@@ -595,17 +477,29 @@ class SphinxPackageImporter:
                 already exists for our project, and ``force`` was not ``True``
         """
         assert not all([filename, file_obj]), 'provide either "filename" or "file_obj" but not both'
-        with tarfile.open(name=filename, fileobj=file_obj) as package:
-            self.load_config(package)
-            version = self.get_version(package, force=force)
-            self.import_images(package, version)
-            self.import_pages(package, version)
-            self.link_pages()
-        # Point version.head at the top page of the documentation set
-        version.head = SphinxPage.objects.get(version=version, relative_path=self.config['root_doc'])
-        version.save()
-        # Mark the appropriate pages as indexable
-        version.mark_searchable_pages()
+        with ExitStack() as stack:
+            pool: Optional[Executor] = None
+            if self.workers > 1:
+                # Set up the pool before we open our transaction.  Use
+                # ``spawn`` so that workers start clean instead of forking
+                # copies of our database connections.
+                pool = stack.enter_context(ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                ))
+            with transaction.atomic():
+                # Open the archive in stream mode: read_package() only ever moves
+                # forward through it, so we can read it sequentially in big chunks
+                with tarfile.open(name=filename, fileobj=file_obj, mode='r|*', bufsize=TAR_BUFFER_SIZE) as package:
+                    version, pages = self.read_package(package, force=force)
+                self.save_images(version)
+                self.import_pages(pages, version, pool=pool)
+                self.link_pages()
+                # Point version.head at the top page of the documentation set
+                version.head = SphinxPage.objects.get(version=version, relative_path=self.config['root_doc'])
+                version.save()
+                # Mark the appropriate pages as indexable
+                version.mark_searchable_pages()
         project = version.project
         changed: bool = False
         if project.latest_version is None:
@@ -63,9 +63,15 @@ class Command(BaseCommand):
             default=False,
             help='Overwrite documentation for any matching existing version.'
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='The number of worker processes to use to prepare the page HTML.'
+        )
 
     def handle(self, *args, **options) -> None:
-        importer = SphinxPackageImporter()
+        importer = SphinxPackageImporter(workers=options['workers'])
         try:
             version = importer.run(filename=options['tarfile'], force=options['force'])
         except VersionAlreadyExists as e:
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.7 on 2026-10-16 02:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sphinxhostingcore', '0016_project_last_version_alter'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='version',
+            index=models.Index(fields=['project', 'version'], name='version_project_version_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='version',
+            index=models.Index(fields=['sphinx_version'], name='version_sphinx_version_idx'),
+        ),
+    ]
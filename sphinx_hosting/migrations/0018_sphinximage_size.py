@@ -0,0 +1,40 @@
+# Generated by Django 5.0.7 on 2026-10-16 02:27
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def set_image_sizes(apps, schema_editor):
+    """
+    Fill in :py:attr:`sphinx_hosting.models.SphinxImage.size` for the images
+    that were imported before we recorded sizes, by asking the storage
+    backend for each one.  Images whose file is missing from storage are left
+    with a ``size`` of ``None``.
+    """
+    SphinxImage = apps.get_model("sphinxhostingcore", "SphinxImage")
+    now = timezone.now()
+    images = SphinxImage.objects.filter(size__isnull=True).only('id', 'file')
+    for image in images.iterator(chunk_size=500):
+        try:
+            size = image.file.size
+        except (OSError, ValueError):
+            continue
+        # Bump modified too, so that API clients don't get a 304 for the
+        # image's old representation
+        SphinxImage.objects.filter(pk=image.pk).update(size=size, modified=now)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sphinxhostingcore', '0017_version_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sphinximage',
+            name='size',
+            field=models.PositiveIntegerField(blank=True, default=None, help_text="The size of the image file in bytes, recorded at import time so that we don't have to ask the storage backend for it", null=True, verbose_name='Size'),
+        ),
+        migrations.RunPython(set_image_sizes, reverse_code=migrations.RunPython.noop),
+    ]
@@ -5,6 +5,7 @@ from typing import cast, Any, List, Dict, Optional
 from urllib.parse import urlparse, unquote
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.utils.functional import cached_property
 from django.urls import reverse
@@ -749,16 +750,17 @@ class Version(TimeStampedModel, models.Model):
         requirements, ``False`` otherwise.
         """
         ignored_paths = list(SphinxPage.SPECIAL_PAGES.keys())
-        for page in self.pages.all():
-            if (
-                page.relative_path not in ignored_paths and
-                not page.relative_path.startswith('_') and
-                '/_' not in page.relative_path
-            ):
-                page.searchable = True
-            else:
-                page.searchable = False
-            page.save()
+        # Do this with two UPDATEs instead of loading and saving every page.
+        # update() doesn't bump ``modified`` like save() does, so do it
+        # ourselves: the API's ETags depend on it.
+        unsearchable = (
+            models.Q(relative_path__in=ignored_paths) |
+            models.Q(relative_path__startswith='_') |
+            models.Q(relative_path__contains='/_')
+        )
+        now = timezone.now()
+        self.pages.filter(unsearchable).update(searchable=False, modified=now)
+        self.pages.exclude(unsearchable).update(searchable=True, modified=now)
 
     @cached_property
     def globaltoc(self) -> Dict[str, List[Dict[str, Any]]]:
@@ -808,6 +810,19 @@ class Version(TimeStampedModel, models.Model):
         super().save(*args, **kwargs)
         self.purge_cached_globaltoc()
 
+    # Inherit TimeStampedModel's Meta so that we keep its get_latest_by
+    class Meta(TimeStampedModel.Meta):
+        indexes = [
+            # We look versions up by project and version number for every
+            # version and page view, and the API filters on version number
+            # and sphinx version with iexact and istartswith.  Those can only
+            # use these plain B-tree indexes with a case-insensitive
+            # collation, like MySQL's defaults; on PostgreSQL they compile
+            # to UPPER()/ILIKE and need functional indexes instead.
+            models.Index(fields=['project', 'version'], name='version_project_version_idx'),
+            models.Index(fields=['sphinx_version'], name='version_sphinx_version_idx'),
+        ]
+
 
 class SphinxPage(TimeStampedModel, models.Model):
     """
@@ -978,6 +993,16 @@ class SphinxImage(TimeStampedModel, models.Model):
         upload_to=sphinx_image_upload_to,
         help_text=_('The actual image file')
     )
+    size: F = models.PositiveIntegerField(
+        _('Size'),
+        null=True,
+        blank=True,
+        default=None,
+        help_text=_(
+            'The size of the image file in bytes, recorded at import time so '
+            'that we don\'t have to ask the storage backend for it'
+        )
+    )
 
     class Meta:
         verbose_name = _('sphinx image')
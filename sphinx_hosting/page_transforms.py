@@ -0,0 +1,321 @@
+"""
+The HTML munging :py:class:`sphinx_hosting.importers.SphinxPackageImporter`
+does to each Sphinx page before saving it to the database.
+
+This is pure CPU work on plain data, so the importer can run it in worker
+processes.  Keep it that way: nothing in this module may import our models or
+anything else that needs Django settings, because workers started with
+``spawn`` import this module fresh, without Django being set up.
+"""
+import re
+from typing import Any, Dict, Iterable, Mapping, Pattern, Tuple
+import urllib.parse
+
+from django.utils.text import slugify
+import lxml.html
+from lxml.cssselect import CSSSelector
+from lxml.etree import XML, XPath  #: pylint: disable=no-name-in-module
+import orjson
+
+
+#: Precompiled CSS selectors for the HTML we munge while importing pages.
+#: ``element.cssselect(expr)`` translates ``expr`` to XPath and compiles it on
+#: every call; these do that once.  We use the ``html`` translator to match
+#: what :py:meth:`lxml.html.HtmlElement.cssselect` does.
+_IMG_SELECTOR: CSSSelector = CSSSelector('img', translator='html')
+_LIGHTBOX_SELECTOR: CSSSelector = CSSSelector('a[data-lightbox]', translator='html')
+_INTERNAL_LINK_SELECTOR: CSSSelector = CSSSelector('a.reference.internal', translator='html')
+_H1_SELECTOR: CSSSelector = CSSSelector('h1', translator='html')
+_TABLE_SELECTOR: CSSSelector = CSSSelector('table', translator='html')
+_FIRST_UL_SELECTOR: CSSSelector = CSSSelector('ul:first-child', translator='html')
+_NESTED_UL_SELECTOR: CSSSelector = CSSSelector('li > ul', translator='html')
+_SECOND_A_SELECTOR: CSSSelector = CSSSelector('a:nth-child(2)', translator='html')
+_FIRST_LI_UL_SELECTOR: CSSSelector = CSSSelector('li:first-child ul', translator='html')
+
+#: Precompiled XPath for ``tbody > tr div.line``, scoped to a table
+_TBODY_LINE_DIV_XPATH: XPath = XPath(
+    ".//tbody/tr//div[contains(concat(' ', normalize-space(@class), ' '), ' line ')]"
+)
+#: Precompiled XPath for ``tbody > tr p``, scoped to a table
+_TBODY_P_XPATH: XPath = XPath('.//tbody/tr//p')
+
+#: Matches the ``../`` segments at the start of a relative link
+_LEADING_PARENT_DIRS_RE: Pattern = re.compile(r'^(?:\.\./)+')
+#: Matches the Django template tags that lxml URL quoted in attributes, whether
+#: it quoted the braces (``%7B%%20 ... %20%%7D``) or not (``{%%20 ... %20%}``)
+_QUOTED_TAG_RE: Pattern = re.compile(r'{%%20.*?%20%}|%7B%%20.*?%20%%7D')
+
+
+def _update_image_src(html: lxml.html.HtmlElement, image_ids: Mapping[str, int]) -> None:
+    """
+    Given an HTML body of a Sphinx page, update the ``<img src="path">``
+    references to template tag expressions that load the actual image URL
+    from the :py:class:`sphinx_hosting.models.SphinxImage` objects at render time.
+
+    We need to defer filling in the URL of the image until render time
+    because of things like storing images in S3 and using time-limited S3
+    auth parameters to retrieve the image from a private bucket.  Those
+    parameters expire typically after an hour, so if we don't defer figuring
+    out the URL for our images, we end up storing a stale URL.
+
+    Also deal with any lightboxes by converting them to the appropriate form
+    to work with Tabler lightboxes.
+
+    Args:
+        html: the parsed HTML body of a Sphinx document, which we update
+            in place
+        image_ids: a map of original Sphinx image paths to the ids of their
+            :py:class:`sphinx_hosting.models.SphinxImage` objects
+    """
+    images = _IMG_SELECTOR(html)
+    for image in images:
+        src = image.attrib['src'].replace('../', '')
+        if src in image_ids:
+            image.attrib['src'] = f'{{% sphinximage_url {image_ids[src]} %}}'
+
+    # also deal with any lightbox <a>
+    lightboxes = _LIGHTBOX_SELECTOR(html)
+    for lightbox in lightboxes:
+        lightbox.attrib['data-fslightbox'] = lightbox.attrib['data-lightbox']
+        del lightbox.attrib['data-lightbox']
+        if 'data-title' in lightbox.attrib:
+            lightbox.attrib['data-caption'] = lightbox.attrib['data-title']
+            del lightbox.attrib['data-title']
+        src = lightbox.attrib['href'].replace('../', '')
+        if src in image_ids:
+            lightbox.attrib['href'] = f'{{% sphinximage_url {image_ids[src]} %}}'
+
+
+def _fix_page_title(
+    path: str,
+    data: Dict[str, Any],
+    special_pages: Mapping[str, str],
+    odd_titles: Iterable[str]
+) -> None:
+    """
+    Ensure that there is a ``title`` key in ``data``, the JSON data from our
+    .fjson file.  Some special pages don't have a ``title`` key in their
+    JSON data, so we supply one based on their filename, or by copying
+    another key from ``data``.
+
+    Args:
+        path: the file path in the tarfile
+        data: the JSON data from our file
+        special_pages: :py:attr:`sphinx_hosting.models.SphinxPage.SPECIAL_PAGES`
+        odd_titles: titles to replace with ``path``
+    """
+    if 'title' not in data:
+        data['title'] = 'UNKNOWN'
+    if path in special_pages:
+        data['title'] = special_pages[path]
+    if data['title'] in odd_titles:
+        data['title'] = path
+    if 'title' not in data:
+        # Some of the special pages don't have 'title' keys
+        if 'indextitle' in data:
+            data['title'] = data['indextitle']
+        else:
+            data['title'] = special_pages[path]
+
+
+def _fix_link_hrefs(path: str, html: lxml.html.HtmlElement, link_prefix: str) -> None:
+    """
+    Given an HTML body of a Sphinx page, update the ``<a href="path">``
+    references for "path" to be rendered at page render time.  If we don't
+    do this, a lot of links won't work, because they do
+    index page, instead of being relative to the root of the docs, and won't
+    work.
+
+    Args:
+        path: the path to the current page
+        html: the parsed HTML body of a Sphinx document, which we update
+            in place
+        link_prefix: the start of the ``{% url %}`` tag to rewrite links to,
+            up to the page path
+    """
+    # Find all internal references
+    links = _INTERNAL_LINK_SELECTOR(html)
+
+    # For each link, update its URL to be rendered at page render time
+    for link in links:
+        href = link.attrib['href']
+        anchor = ''
+        hash_index = href.find('#')
+        if hash_index != -1:
+            # Drop a bare trailing "#", like the old href.split('#') did
+            if href[hash_index + 1:]:
+                anchor = href[hash_index:]
+            href = href[:hash_index]
+        if href.endswith('/'):
+            href = href[:-1]
+        # To deal with relative links, we need to know our current path
+        # and then compute the absolute path from that.
+        levels = href.count('../')
+        if levels:
+            href = _LEADING_PARENT_DIRS_RE.sub('', href)
+            href = '/'.join(path.split('/')[:-(levels)] + [href])
+        # anchor is either empty or includes its leading "#"
+        link.attrib['href'] = link_prefix + href + "' %}" + anchor
+
+
+def _fix_page_body(
+    path: str,
+    data: Dict[str, Any],
+    image_ids: Mapping[str, int],
+    link_prefix: str
+) -> None:
+    """
+    Do any work needed to prepare the page body before inserting into the
+    database.  This means:
+
+    * Ensure the ``body`` key exists in ``data``
+    * Update the ``img`` sources to point to our Django storage location.
+    * Update the ``href``s for any ``<a>`` links to be rendered at page
+      render time.
+    * Update the ``<table>``s to have the CSS classes we need for them to
+      display nicely.
+
+    Args:
+        path: the path to the current page
+        data: the JSON data from our file
+        image_ids: a map of original Sphinx image paths to image ids
+        link_prefix: the start of the ``{% url %}`` tag to rewrite links to
+    """
+    if 'body' not in data or data['body'] is None:
+        # Ensure we always have data['body'] defined as a string, for when
+        # we create the SphinxPage, below
+        data['body'] = ''
+    data['orig_body'] = data['body']
+    if data['body']:
+        # Parse the body once, do all our changes on the tree, and
+        # serialize it once at the end
+        html = lxml.html.fromstring(data['body'])
+        # Update the img src for any images in data['body'] for to point to our
+        # Django storage locations
+        _update_image_src(html, image_ids)
+        # Update the hrefs for any <a> links to be absolute.  The relative
+        # paths we get from Sphinx end up being relative to the Sphinx index
+        # document instead of to the root of the docs
+        _fix_link_hrefs(path, html, link_prefix)
+        # remove the first <h1> -- we'll display the page title another way
+        first_h1 = _H1_SELECTOR(html)
+        if first_h1:
+            first_h1[0].getparent().remove(first_h1[0])
+        # Fix our tables to look better
+        tables = _TABLE_SELECTOR(html)
+        for table in tables:
+            wrapper = XML('<div class="table-responsive"></div>')
+            parent = table.getparent()
+            parent.append(wrapper)
+            wrapper.insert(0, table)
+            table.classes.add('table')
+            table.classes.add('table-striped')
+            table.classes.add('border')
+            for tr in table.iterfind('.//thead/tr'):
+                tr.classes.discard('row-even')
+                tr.classes.discard('row-odd')
+            for tr in table.iter('th'):
+                tr.classes.discard('head')
+                tr.classes.add('p-2')
+            for tr in table.iterfind('.//tbody/tr'):
+                tr.classes.discard('row-even')
+                tr.classes.discard('row-odd')
+            for div in _TBODY_LINE_DIV_XPATH(table):
+                div.classes.discard('line')
+                div.classes.add('text-start')
+            for div in _TBODY_P_XPATH(table):
+                div.classes.add('text-start')
+        data['body'] = lxml.html.tostring(html).decode('utf-8')
+        # Unescape our template tags after lxml has converted our {% %}
+        # to entities.  Do it in one pass over the body, rather than one
+        # pass per tag.
+        data['body'] = _QUOTED_TAG_RE.sub(lambda m: urllib.parse.unquote(m.group()), data['body'])
+        # Convert the weird paragraph symbols to actual paragraph symbols
+        data['body'] = data['body'].replace('#61633;', 'para;')
+
+
+def _fix_toc(data: Dict[str, Any]) -> None:
+    """
+    Update our page's local table of contents (``data['toc']`) to have the CSS
+    classes we need in order for it to display properly.
+
+    Args:
+        data: the decoded JSON data of the sphinx page
+    """
+    if 'toc' not in data:
+        return
+    data['orig_toc'] = data['toc']
+    html = lxml.html.fromstring(data['toc'])
+    ul_first = _FIRST_UL_SELECTOR(html)[0]
+    # Turn the first <ul> into a tabler vertical nav
+    ul_first.classes.add('nav-vertical')
+    # Turn all <uls> into nav-pills and nav
+    for ul in html.iter('ul'):
+        ul.classes.add('nav')
+        ul.classes.add('nav-pills')
+    # Make all list items into nav-items
+    for li in html.iter('li'):
+        li.classes.add('nav-item')
+    # Make <a> into nav-links
+    for link in html.iter('a'):
+        link.classes.add('nav-link')
+    # Now make the embedded uls collapsable
+    for ul in _NESTED_UL_SELECTOR(html):
+        wrapper = XML('<div class="d-flex flex-row justify-content-between align-items-center"></div>')
+        link = ul.getprevious()
+        link.addprevious(wrapper)
+        wrapper.insert(0, link)
+        target = f'menu-{slugify(link.text_content())}'
+        wrapper.append(XML(
+            '<a class="toc__toggle nav-link-toggle" data-bs-toggle="collapse" '
+            f'aria-expanded="false" data-bs-target="#{target}"></a>'
+        ))
+        ul.attrib['id'] = target
+        ul.classes.add('collapse')
+    try:
+        link = _SECOND_A_SELECTOR(html)[0]
+        link.attrib['aria-expanded'] = 'true'
+    except IndexError:
+        pass
+    try:
+        ul = _FIRST_LI_UL_SELECTOR(html)[0]
+        ul.classes.add('show')
+    except IndexError:
+        pass
+    data['toc'] = lxml.html.tostring(html).decode('utf-8')
+
+
+def transform_page(
+    page: Tuple[str, bytes],
+    image_ids: Mapping[str, int],
+    link_prefix: str,
+    special_pages: Mapping[str, str],
+    odd_titles: Tuple[str, ...]
+) -> Tuple[str, Dict[str, Any], str]:
+    """
+    Decode the JSON for one page and do all the work needed to prepare it
+    for the database: fix its title, its body and its table of contents.
+
+    Everything is passed in as plain data so that this can run in a worker
+    process.
+
+    Args:
+        page: a ``(path, raw JSON)`` tuple, as returned by
+            :py:meth:`sphinx_hosting.importers.SphinxPackageImporter.read_package`
+        image_ids: a map of original Sphinx image paths to the ids of their
+            :py:class:`sphinx_hosting.models.SphinxImage` objects
+        link_prefix: the start of the ``{% url %}`` tag to rewrite internal
+            links to, up to the page path
+        special_pages: :py:attr:`sphinx_hosting.models.SphinxPage.SPECIAL_PAGES`
+        odd_titles: page titles to replace with the page's path
+
+    Returns:
+        The path, the updated page data, and that data serialized back to
+        JSON for :py:attr:`sphinx_hosting.models.SphinxPage.content`.
+    """
+    path, content = page
+    data = orjson.loads(content)
+    _fix_page_title(path, data, special_pages, odd_titles)
+    _fix_page_body(path, data, image_ids, link_prefix)
+    _fix_toc(data)
+    return path, data, orjson.dumps(data).decode('utf-8')
@@ -3,7 +3,9 @@ from typing import List, Type
 
 from django.db.models import Model, QuerySet, F
 import elasticsearch.exceptions
+import elasticsearch.helpers
 from haystack import indexes
+from haystack.utils import get_identifier
 
 from .logging import logger
 from .models import SphinxPage, Project, Version
@@ -38,9 +40,30 @@ class SphinxPageIndex(indexes.SearchIndex, indexes.Indexable):
             version_id: The version whose pages we want to remove from the index.
         """
         qs = self.get_model().objects.filter(version__id=version.pk).filter(searchable=True)
-        logger.info('Removing %d pages from the search index for version %s', qs.count(), version)
-        for obj in qs:
-            self.remove_object(obj)
+        backend = self.get_backend(None)
+        conn = getattr(backend, 'conn', None)
+        if conn is None:
+            # Not Elasticsearch: fall back to removing the pages one at a time
+            logger.info('Removing %d pages from the search index for version %s', qs.count(), version)
+            for obj in qs:
+                self.remove_object(obj)
+            return
+        # Removing pages one at a time costs a delete and an index refresh per
+        # page, so instead delete them all with a single bulk request and
+        # refresh once.  We only need the pks to build the document ids.
+        doc_ids = [get_identifier(obj) for obj in qs.only('id')]
+        logger.info('Removing %d pages from the search index for version %s', len(doc_ids), version)
+        if not doc_ids:
+            return
+        if not backend.setup_complete:
+            backend.setup()
+        elasticsearch.helpers.bulk(
+            conn,
+            ({'_op_type': 'delete', '_index': backend.index_name, '_id': doc_id} for doc_id in doc_ids),
+            # Pages that were never indexed come back as 404s, which is fine
+            raise_on_error=False,
+        )
+        conn.indices.refresh(index=backend.index_name)
 
     def reindex_project(self, project: Project) -> None:  # type: ignore[note]
         """
@@ -1,13 +1,33 @@
+from functools import lru_cache
 from typing import Any, Dict, List
 
 from django.conf import settings
 from django.templatetags.static import static
+from django.utils.functional import lazy
 
 
 app_settings: Dict[str, Any] = getattr(settings, 'SPHINX_HOSTING_SETTINGS', {})
 
-#: The django path to the logo image.
-LOGO_IMAGE: str = static(
+
+@lru_cache(maxsize=None)
+def _cached_static(path: str) -> str:
+    """
+    Resolve the URL for the static file ``path`` once per process.
+
+    Args:
+        path: the path to the static file
+
+    Returns:
+        The URL to the static file.
+    """
+    return static(path)
+
+
+#: The django path to the logo image.  This is resolved lazily because this
+#: module is imported while the app registry is loading, and hashing static
+#: file storages like ``ManifestStaticFilesStorage`` can't resolve URLs
+#: before their manifest exists.
+LOGO_IMAGE: str = lazy(_cached_static, str)(
     app_settings.get(
         'LOGO_IMAGE',
         'sphinx_hosting/images/logo.jpg',
@@ -23,3 +43,7 @@ MAX_GLOBAL_TOC_TREE_DEPTH: int = app_settings.get('MAX_GLOBAL_TOC_TREE_DEPTH', 2
 #: Version glob patterns that if matched, will exlude the version from being
 #: marked as latest.  This is primarily for .dev. versions.j
 EXCLUDE_FROM_LATEST: List[str] = app_settings.get('EXCLUDE_FROM_LATEST', ['*-dev*', '*-alpha*', '*-beta*', '*-rc*'])
+#: If ``True``, when importing an uploaded documentation tarball fails, save a
+#: copy of the tarball to default storage under ``failed_uploads/`` for
+#: debugging.  Defaults to the value of ``DEBUG``.
+SAVE_FAILED_UPLOADS: bool = app_settings.get('SAVE_FAILED_UPLOADS', settings.DEBUG)
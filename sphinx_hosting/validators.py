@@ -1,3 +1,4 @@
+import re
 from typing import Any
 
 from django.core.exceptions import ValidationError
@@ -26,7 +27,7 @@ class NoHTMLValidator:
         )
 
 
-machine_name_re = _lazy_re_compile(r"^[-a-zA-Z0-9_.]+\Z")
+machine_name_re = _lazy_re_compile(r"^[-a-zA-Z0-9_.]+\Z", flags=re.ASCII)
 validate_machine_name = RegexValidator(
     machine_name_re,
     # Translators: "letters" means latin letters: a-z and A-Z.
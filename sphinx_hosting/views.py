@@ -1,5 +1,4 @@
-import os
-import tempfile
+import uuid
 from typing import Dict, List, Optional, Type, cast
 
 from braces.views import (
@@ -11,7 +10,8 @@ from braces.views import (
 )
 from django.contrib import messages
 from django.contrib.auth.models import AbstractUser
-from django.core.files.storage import FileSystemStorage
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import TemporaryUploadedFile
 from django.db.models import Model, QuerySet
 from django.forms import ModelForm, Form
 from django.http import HttpResponse, HttpRequest, Http404
@@ -48,7 +48,6 @@ from wildewidgets.viewsets import ModelViewSet
 from .forms import (
     ProjectCreateForm,
     ProjectUpdateForm,
-    ProjectReadonlyUpdateForm,
     ProjectRelatedLinkCreateForm,
     ProjectRelatedLinkUpdateForm,
     VersionUploadForm,
@@ -63,13 +62,14 @@ from .models import (
     Version,
     SphinxPage
 )
-
+from .settings import SAVE_FAILED_UPLOADS
 from .wildewidgets import (
     ProjectClassifierListWidget,
     ProjectClassifierSelectorWidget,
     ProjectCreateModalWidget,
     ProjectDetailWidget,
     ProjectInfoWidget,
+    ProjectReadonlyDetailWidget,
     ProjectRelatedLinkCreateModalWidget,
     ProjectRelatedLinksWidget,
     ProjectRelatedLinksListWidget,
@@ -166,12 +166,7 @@ class ProjectDetailView(  # type: ignore[misc]
     def get_content(self) -> Widget:
         layout = WidgetListLayout(self.object.title)
         layout.add_widget(ProjectInfoWidget(self.object))
-        layout.add_widget(
-            ProjectDetailWidget(
-                self.object,
-                form=ProjectReadonlyUpdateForm(instance=self.object)
-            )
-        )
+        layout.add_widget(ProjectReadonlyDetailWidget(self.object))
         layout.add_widget(ProjectRelatedLinksListWidget(queryset=self.object.related_links.all()))
         layout.add_widget(ProjectClassifierListWidget(queryset=self.object.classifiers.all()))
         layout.add_widget(ProjectVersionsTableWidget(project_id=self.object.pk))
@@ -579,24 +574,33 @@ class VersionUploadView(
         return f'Uploaded version "{version.version}" to project "{version.project.title}"'
 
     def form_valid(self, form: Form):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            fs = FileSystemStorage(tmpdir)
-            filename = fs.save('docs.tar.gz', content=self.request.FILES['file'])  # type: ignore
-            path = os.path.join(fs.location, filename)
-            self.version: Optional[Version] = None
-            try:
-                self.version = SphinxPackageImporter().run(filename=path, force=True)
-            except Project.DoesNotExist:
-                logger.error('version.upload.failed.no-such-project')
-                self.messages.error(
-                    'The project for the your tarball was not found.  Ensure that '
-                    'the "project" field in your Sphinx "conf.py" matches the machine name '
-                    'of an existing project here.'
-                )
-            except Exception as e:
-                logger.error('version.upload.failed.unknown, error=%s', str(e))
-                os.rename(path, '/tmp/uploaded_file')
-                raise
+        uploaded = self.request.FILES['file']
+        # Django has already spooled the upload either to a temporary file on
+        # disk (large uploads) or to memory (small ones), so read it from
+        # there rather than copying it somewhere else first.
+        if isinstance(uploaded, TemporaryUploadedFile):
+            kwargs = {'filename': uploaded.temporary_file_path()}
+        else:
+            kwargs = {'file_obj': uploaded}
+        self.version: Optional[Version] = None
+        try:
+            self.version = SphinxPackageImporter().run(force=True, **kwargs)
+        except Project.DoesNotExist:
+            logger.error('version.upload.failed.no-such-project')
+            self.messages.error(
+                'The project for the your tarball was not found.  Ensure that '
+                'the "project" field in your Sphinx "conf.py" matches the machine name '
+                'of an existing project here.'
+            )
+        except Exception as e:
+            logger.error('version.upload.failed.unknown, error=%s', str(e))
+            if SAVE_FAILED_UPLOADS:
+                # Keep a copy of the tarball that broke the importer for
+                # debugging, under a name unique to this request
+                uploaded.seek(0)
+                name = default_storage.save(f'failed_uploads/{uuid.uuid4()}.tar.gz', uploaded)
+                logger.error('version.upload.failed.saved name=%s', name)
+            raise
         version = cast(Version, self.version)
         logger.info(
             'version.upload.success project_id=%s project_title=%s version=%s',
@@ -2,6 +2,7 @@ from typing import Dict, List, Optional, Type
 
 from django.contrib.auth.models import AbstractUser
 from django.db.models import Model, QuerySet
+from django.template.defaultfilters import linebreaksbr
 from wildewidgets import (
     ActionButtonModelTable,
     BasicModelTable,
@@ -225,6 +226,54 @@ class ProjectDetailWidget(
     css_class: str = CrispyFormWidget.css_class + " p-4"
 
 
+class ProjectReadonlyDetailWidget(Block, Widget):
+    """
+    This widget shows the title and description of a
+    :py:class:`sphinx_hosting.models.Project` to people who are just viewing
+    it.  It uses the same horizontal layout as the form in
+    :py:class:`ProjectDetailWidget` so the page looks the same, but renders
+    the values directly instead of building and rendering a read-only form.
+
+    Args:
+        project: the project to show
+    """
+    title: str = "General Settings"
+    name: str = 'project-detail__section'
+    modifier: str = 'general'
+    icon: str = "card-checklist"
+    css_class: str = "form-horizontal p-4"
+
+    def __init__(self, project: Project, **kwargs):
+        super().__init__(**kwargs)
+        self.add_block(self.get_field('Title', project.title))
+        self.add_block(self.get_field('Description', project.description))
+
+    def get_field(self, label: str, value: Optional[str]) -> Block:
+        """
+        Build a labelled row for one of our project's fields.  The value is
+        HTML escaped and its line breaks are kept, as they would be in a
+        textarea.  Empty values are shown as "—".
+
+        Args:
+            label: the label for the field
+            value: the value of the field
+
+        Returns:
+            The row.
+        """
+        return Block(
+            Block(label, tag='label', css_class='col-form-label col-lg-3'),
+            Block(
+                Block(
+                    linebreaksbr(value, autoescape=True) if value else '\u2014',
+                    css_class='form-control bg-light'
+                ),
+                css_class='col'
+            ),
+            css_class='mb-3 row'
+        )
+
+
 #------------------------------------------------------
 # ProjectRelatedLink related widgets
 #------------------------------------------------------